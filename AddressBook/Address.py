@@ -83,6 +83,33 @@ class Address:
             raise ValueError(f"Invalid email format: {value}")
 
 
+    @classmethod
+    def from_trusted(cls, firstname: str, lastname: str, street: Optional[str] = None, number: Optional[str] = None,
+                     postal_code: Optional[int | str] = None, place: Optional[str] = None,
+                     birthdate: Optional[date | str] = None, phone: Optional[str] = None,
+                     email: Optional[str] = None) -> 'Address':
+        """
+        Creates an address from values the address book has written itself, skipping the pydantic validation.
+        Only the conversions the validation would do for such data are applied (postal code to int, ISO birthdate
+        string to `datetime.date`, empty email to None). Never use this for unchecked input.
+
+        :return: The address with the given values.
+        :rtype: Address
+        """
+        address = object.__new__(cls)
+        address.__dict__.update(
+            firstname=firstname,
+            lastname=lastname,
+            street=street,
+            number=number,
+            postal_code=int(postal_code) if postal_code not in (None, '') else None,
+            place=place,
+            birthdate=date.fromisoformat(birthdate) if isinstance(birthdate, str) and birthdate else birthdate or None,
+            phone=phone,
+            email=email or None
+        )
+        return address
+
     def __str__(self):
         """
         Returns a string representation of the address book entry.
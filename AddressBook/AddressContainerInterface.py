@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, Optional
+from pydantic import ValidationError
 from AddressBook.Address import Address
 
 
@@ -42,6 +44,23 @@ class AddressContainerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def transaction(self):
+        """
+        Return a context manager grouping all changes made within its block into one durable unit.
+        Commits or saves are deferred until the block exits; if the block raises an exception, its changes are
+        rolled back and the exception is re-raised.
+
+        Usage::
+
+            with address_book.transaction():
+                for address in addresses:
+                    address_book.add_address(address)
+
+        :return: A context manager yielding the address container.
+        """
+        pass
+
     @abstractmethod
     def search(self, field: str, search_string: str) -> dict[int, Address]:
         """
@@ -90,6 +109,20 @@ class AddressContainerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_addresses(self, addresses: Iterable[Address | dict]) -> list[int]:
+        """
+        Add several addresses to the address book in one batch.
+
+        The result holds one entry per given item, in the same order, using the codes of add_address:
+        the new ID, -1 if the item is a duplicate or 0 if it was rejected (e.g. a dictionary that is no valid address).
+
+        :param Iterable[Address | dict] addresses: The addresses to add (Address instances or dictionaries).
+        :return: The ID or status code for every given item.
+        :rtype: list[int]
+        """
+        pass
+
     @abstractmethod
     def get_all(self) -> dict[int, Address]:
         """
@@ -100,6 +133,102 @@ class AddressContainerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_page(self, limit: int, after_id: int = 0) -> dict[int, Address]:
+        """
+        Retrieve one page of all addresses, ordered by ID (keyset pagination).
+        Pass the last ID of a page as after_id to get the next page; an empty result marks the end.
+
+        :param int limit: The maximum number of addresses on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit addresses with IDs greater than after_id.
+        :rtype: dict[int, Address]
+        """
+        pass
+
+    @abstractmethod
+    def search_page(self, field: str, search_string: str, limit: int, after_id: int = 0) -> dict[int, Address]:
+        """
+        Retrieve one page of the results of search, ordered by ID (keyset pagination).
+
+        :param str field: The field to search within.
+        :param str search_string: The search term to look for.
+        :param int limit: The maximum number of addresses on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit matching addresses with IDs greater than after_id.
+        :rtype: dict[int, Address]
+        """
+        pass
+
+    @abstractmethod
+    def prefix_search(self, field: str, prefix: str, limit: int = 10) -> dict[int, Address]:
+        """
+        Retrieve the addresses whose field starts with a prefix, case-insensitively, e.g. for type-ahead suggestions.
+        The lookup uses an ordered index, so its cost depends on limit and not on the size of the address book.
+
+        :param str field: The field to search within.
+        :param str prefix: The beginning of the field value.
+        :param int limit: The maximum number of addresses to return.
+        :return: A dictionary of at most limit matching addresses, ordered by the field value.
+        :rtype: dict[int, Address]
+        """
+        pass
+
+    @abstractmethod
+    def fuzzy_search(self, field: str, search_string: str, threshold: float = 0.3,
+                     limit: int = 10) -> dict[int, Address]:
+        """
+        Retrieve the addresses whose field is similar to the search string, so misspellings like "Schmitt" for
+        "Schmidt" or "Mueller" for "Müller" are still found. Similarity is measured on trigrams (see Trigram), and
+        the candidates are looked up in a trigram index instead of comparing every address.
+
+        :param str field: The field to search within, one of Trigram.FIELDS.
+        :param str search_string: The search term to look for.
+        :param float threshold: The minimum similarity of a match, from 0 (anything) to 1 (same trigrams).
+        :param int limit: The maximum number of addresses to return.
+        :return: A dictionary of at most limit matching addresses, most similar first.
+        :rtype: dict[int, Address]
+        """
+        pass
+
+    @abstractmethod
+    def search_phonetic(self, name: str, encoder: str = "cologne") -> dict[int, Address]:
+        """
+        Retrieve the addresses whose firstname or lastname sounds like the name, so "Maier" also finds "Meyer".
+        The phonetic codes of the stored names are kept in an index, so a search is a single index lookup.
+
+        :param str name: The name to search for.
+        :param str encoder: The phonetic encoder, "cologne" (Kölner Phonetik, for German names) or "soundex".
+        :return: A dictionary of the matching addresses, ordered by ID.
+        :rtype: dict[int, Address]
+        """
+        pass
+
+    @abstractmethod
+    def iter_addresses(self, batch_size: int = 1000) -> Iterator[tuple[int, Address]]:
+        """
+        Iterate over all stored addresses without building a dictionary of the whole address book.
+        Rows are read from the storage in batches of at most batch_size, so memory use stays constant.
+
+        :param int batch_size: The maximum number of rows read from the storage at once.
+        :return: An iterator of (ID, address) pairs.
+        :rtype: Iterator[tuple[int, Address]]
+        """
+        pass
+
+    @abstractmethod
+    def iter_search(self, field: str, search_string: str, batch_size: int = 1000) -> Iterator[tuple[int, Address]]:
+        """
+        Streaming variant of search, yielding matches as they are read instead of returning a dictionary.
+
+        :param str field: The field to search within.
+        :param str search_string: The search term to look for.
+        :param int batch_size: The maximum number of rows read from the storage at once.
+        :return: An iterator of (ID, address) pairs of the matching addresses.
+        :rtype: Iterator[tuple[int, Address]]
+        """
+        pass
+
     @abstractmethod
     def get(self, id_: int) -> Address or None:
         """
@@ -120,3 +249,20 @@ class AddressContainerInterface(ABC):
         :rtype: dict[int, Address]
         """
         pass
+
+    @staticmethod
+    def _coerce_address(address: Address | dict) -> Optional[Address]:
+        """
+        Convert an item passed to add_addresses into an Address.
+
+        :param Address | dict address: The Address instance or a dictionary with its fields.
+        :return: The Address, or None if the item is no valid address.
+        :rtype: Address, None
+        """
+        if isinstance(address, Address):
+            return address
+        try:
+            return Address(**address)
+        except (TypeError, ValidationError) as e:
+            print(f"Rejected address {address}: {e}")
+            return None
@@ -1,11 +1,52 @@
 import csv
+import hashlib
+import io
+import json
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from AddressBook.Address import Address
+from AddressBook.AddressRecord import AddressRecord
 from AddressBook.AddressContainerInterface import AddressContainerInterface
-from typing import Optional, Dict
+from AddressBook.CSVOffsetIndex import CSVOffsetIndex
+from AddressBook import Phonetic, Trigram
+from typing import Optional, Dict, Set, Tuple, Iterable, Iterator, List, Callable
 from datetime import date
 from pydantic import ValidationError
 from os import path
 
+def _parse_range(filepath: str, fieldnames: List[str], start: int, end: int, trusted: bool,
+                 records: bool) -> Tuple[List[Tuple[int, Address | AddressRecord]], List[Tuple[str, str]]]:
+    """
+    Parses and validates the records in a byte range of a CSV file. Runs in the worker processes of a parallel load.
+
+    :param str filepath: The path to the CSV file.
+    :param List[str] fieldnames: The field names from the header of the file.
+    :param int start: The offset of the first record of the range.
+    :param int end: The offset after the last record of the range.
+    :param bool trusted: Skip the validation, see AddressDatabaseCSV.
+    :param bool records: Create AddressRecord tuples, see AddressDatabaseCSV.
+    :return: The parsed (ID, address) pairs and the (ID, message) pairs of the rows that failed validation.
+    :rtype: Tuple[List[Tuple[int, Address | AddressRecord]], List[Tuple[str, str]]]
+    """
+    parser = AddressDatabaseCSV(trusted=trusted, records=records)
+    with open(filepath, mode='rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    entries, errors = [], []
+    for row in csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames):
+        try:
+            entries.append((int(row['id']), parser._row_to_address(row)))
+        except ValidationError as e:
+            errors.append((row.get('id'), str(e)))
+    return entries, errors
+
+
 class AddressDatabaseCSV(AddressContainerInterface):
     """
     A concrete implementation of AddressContainerInterface for managing address data stored in a CSV file.
@@ -14,14 +55,85 @@ class AddressDatabaseCSV(AddressContainerInterface):
 
     :ivar filepath: Path to the CSV file that stores address book data.
     :ivar addresses: A dictionary of address entries with IDs as keys.
+    :ivar dirty: Whether the address entries have changed since they were last loaded or saved.
+    :ivar modified_ids: The IDs of the entries added, updated or deleted since the last load or save.
+
+    New IDs are handed out from a high-water mark that is seeded from the highest ID in the file when it is opened
+    and only ever grows, so IDs freed by delete are not reused.
+
+    Searching a field builds a casefolded index (field value -> sorted IDs) for that field on first use, which is
+    kept up to date by add_address, update and delete, so later searches on the field are a single lookup.
+    prefix_search additionally keeps the distinct keys of the field index in a sorted list, which it bisects.
+    fuzzy_search likewise builds a trigram index (see Trigram.TrigramIndex) of the searched field on first use.
+    Birthdays are bucketed by (month, day) the same way, so get_todays_birthdays only touches matching entries.
+    The phonetic codes of firstname and lastname (see Phonetic) are indexed as (encoder, code) -> sorted IDs on the
+    first search_phonetic, so later searches are a single lookup. The duplicate index used by is_duplicate and
+    add_address is built on first use too, so open does nothing per entry besides parsing it.
+
+    In journal mode save appends the changes made since the last save to a sidecar log (``<filepath>.journal``)
+    instead of rewriting the whole CSV file, and open replays that log. compact folds the log back into the CSV file;
+    save does this automatically once the log holds more than journal_threshold entries.
+
+    In lazy mode open only memory-maps the file and indexes the byte offsets of its rows (see CSVOffsetIndex), and get
+    parses just the requested row. Every other method loads the whole file first, as a normal open would.
+
+    With several workers, open splits files of at least PARALLEL_MIN_BYTES into byte ranges that start and end at
+    record boundaries, parses and validates them in a process pool and merges the entries in ID order. The merge is a
+    bulk dictionary update, as no index is built while loading.
+
+    In snapshot mode the parsed entries are also written to a JSON sidecar (``<filepath>.snapshot``) keyed on the
+    size, modification time and content hash of the CSV file. open loads that snapshot instead of parsing the file
+    again as long as the key still matches. The snapshot holds plain values only, so reading it can't run code.
     """
 
-    def __init__(self):
+    #: Smaller files are loaded in-process, as starting the worker processes would take longer than parsing.
+    PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+    #: The format of the snapshot; snapshots of another version are replaced.
+    SNAPSHOT_VERSION = 2
+
+    FIELDS = ('firstname', 'lastname', 'street', 'number', 'postal_code', 'place', 'birthdate', 'phone', 'email')
+
+    def __init__(self, trusted: bool = False, records: bool = False, journal: bool = False,
+                 journal_threshold: int = 1000, lazy: bool = False, workers: int = 1, snapshot: bool = False):
         """
         Initializes the AddressDatabaseCSV with an empty address dictionary and no CSV file path.
+
+        :param bool trusted: Load rows without re-validating them. Only use for files written by this class.
+        :param bool records: Store and return entries as read-only AddressRecord tuples instead of Address objects,
+                             which cuts the memory of large address books several-fold.
+        :param bool journal: Save changes to an append-only journal next to the CSV file instead of rewriting it.
+        :param int journal_threshold: Number of journal entries after which save compacts the journal.
+        :param bool lazy: Open the file without loading it and read single rows by ID on demand.
+        :param int workers: The number of processes open uses to parse and validate large files.
+        :param bool snapshot: Keep a binary snapshot of the parsed file to skip parsing while the file is unchanged.
         """
         self.filepath: str or None = None
-        self.addresses: Dict[int, Address] = {}
+        self.trusted: bool = trusted
+        self.records: bool = records
+        self.addresses: Dict[int, Address | AddressRecord] = {}
+        self.dirty: bool = False
+        self.modified_ids: Set[int] = set()
+        # The duplicate, birthday and phonetic indexes are built on first use, so opening a book only parses it.
+        self._duplicate_index: Optional[Dict[Tuple, Set[int]]] = None
+        self._next_id: int = 1
+        self._field_indexes: Dict[str, Dict[str, List[int]]] = {}
+        self._sorted_keys: Dict[str, List[str]] = {}
+        self._trigram_indexes: Dict[str, Trigram.TrigramIndex] = {}
+        self._phonetic_index: Optional[Dict[Tuple[str, str], List[int]]] = None
+        self._birthday_index: Optional[Dict[Tuple[int, int], Set[int]]] = None
+        self._sorted_ids: List[int] = []
+        self.journal: bool = journal
+        self.journal_threshold: int = journal_threshold
+        self._pending: List[dict] = []
+        self._journal_entries: int = 0
+        self._undo: Optional[List[Callable[[], None]]] = None
+        self.lazy: bool = lazy
+        self.workers: int = workers
+        self.snapshot: bool = snapshot
+        self._offset_index: Optional[CSVOffsetIndex] = None
+        self._lazy_changes: Dict[int, List[dict]] = {}
+        # Guards what read methods build on demand: the lazy load and the search indexes.
+        self._build_lock = threading.RLock()
 
     def set_filepath(self, filepath: str):
         """
@@ -36,71 +148,388 @@ class AddressDatabaseCSV(AddressContainerInterface):
         Opens the CSV file at the specified file path and loads its contents into the internal address dictionary.
 
         Each row in the CSV file represents an address entry. If the file is not found, the dictionary remains empty.
+        The ID allocator is advanced past the highest ID found in the file. In journal mode the changes recorded in
+        the journal are replayed afterwards. In lazy mode an existing file is only indexed, see _materialize.
 
         :raises FileNotFoundError: If the specified CSV file does not exist.
         """
+        if self.lazy and path.exists(self.filepath):
+            self._offset_index = CSVOffsetIndex(self.filepath)
+            self._lazy_changes = self._read_journal() if self.journal else {}
+            self.modified_ids.clear()
+            self.dirty = False
+            return
+        self._load()
+
+    def _load(self):
+        """
+        Loads the CSV file and the journal into the address dictionary, see open. The entries are stored in bulk and
+        the indexes are dropped, to be rebuilt on first use, so the load does no per-entry work besides parsing.
+        """
         try:
-            with open(self.filepath, mode='r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
+            self.addresses.update(self._read_snapshot() if self.snapshot else self._read_entries())
+            self._sorted_ids = sorted(self.addresses)
+            if self._sorted_ids:
+                self._next_id = max(self._next_id, self._sorted_ids[-1] + 1)
+            self._drop_indexes()
+        except FileNotFoundError:
+            print(f"File {self.filepath} not found. Initializing empty dictionary.")
+            self._clear()
+        if self.journal:
+            self._replay_journal()
+        self.modified_ids.clear()
+        # A book without a file still has to be written once, even if it is never changed.
+        self.dirty = not path.exists(self.filepath)
+
+    def _materialize(self):
+        """
+        Loads the whole file if it was opened lazily. Called by every method that needs the address dictionary.
+        Concurrent readers wait until the load has finished; get keeps reading through the offset index meanwhile.
+        """
+        if self._offset_index is not None:
+            with self._build_lock:
+                offset_index = self._offset_index
+                if offset_index is not None:
+                    self._load()
+                    self._offset_index = None
+                    self._lazy_changes = {}
+                    offset_index.close()
+
+    def _insert(self, id_: int, address: Address | AddressRecord):
+        """
+        Stores an address entry under the given ID, replacing an existing entry, and keeps indexes and the ID
+        allocator in sync.
+
+        :param int id_: The ID of the address entry.
+        :param address: The address entry to store.
+        :type address: Address | AddressRecord
+        """
+        if id_ in self.addresses:
+            self._unindex_address(id_, self.addresses[id_])
+        else:
+            insort(self._sorted_ids, id_)
+        self.addresses[id_] = address
+        self._index_address(id_, address)
+        self._next_id = max(self._next_id, id_ + 1)
+
+    def _read_file(self, batch_size: int = 1000) -> Iterator[Tuple[int, Address]]:
+        """
+        Reads the CSV file in batches of at most batch_size rows and yields the parsed address entries.
+        Rows that fail validation are reported and skipped.
+
+        :param int batch_size: The maximum number of rows read at once.
+        :return: An iterator of (ID, Address) pairs in file order.
+        :rtype: Iterator[Tuple[int, Address]]
+        :raises FileNotFoundError: If the specified CSV file does not exist.
+        """
+        with open(self.filepath, mode='r', newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            while batch := list(islice(reader, batch_size)):
+                for row in batch:
                     try:
-                        # Ensure no leading/trailing spaces in the emails
-                        row['email'] = row['email'].strip() if row['email'] else ''
-                        address = Address(
-                            firstname=row['firstname'],
-                            lastname=row['lastname'],
-                            street=row.get('street'),
-                            number=row.get('number'),
-                            postal_code=int(row['postal_code']) if row['postal_code'] else None,
-                            place=row.get('place'),
-                            birthdate=row.get('birthdate'),
-                            phone=row.get('phone'),
-                            email=row['email']
-                        )
-                        self.addresses[int(row['id'])] = address  # Use ID from CSV as the key
+                        address = self._row_to_address(row)
                     except ValidationError as e:
                         print(f"Error loading address with ID {row.get('id')}: {e}")
                         continue
+                    yield int(row['id']), address  # Use ID from CSV as the key
+
+    def _read_entries(self) -> Iterable[Tuple[int, Address | AddressRecord]]:
+        """
+        Parses the CSV file, in parallel if workers are configured and the file is large enough.
+
+        :return: The (ID, address) pairs.
+        :rtype: Iterable[Tuple[int, Address | AddressRecord]]
+        :raises FileNotFoundError: If the specified CSV file does not exist.
+        """
+        if self.workers > 1 and path.getsize(self.filepath) >= self.PARALLEL_MIN_BYTES:
+            return self._read_parallel()
+        return self._read_file()
+
+    def _snapshot_path(self) -> str:
+        """
+        Returns the path of the snapshot belonging to the CSV file.
+
+        :return: The path of the snapshot.
+        :rtype: str
+        """
+        return self.filepath + '.snapshot'
+
+    def _file_key(self, stat: os.stat_result) -> dict:
+        """
+        Computes the key identifying the current content of the CSV file.
+
+        :param os.stat_result stat: The status of the CSV file.
+        :return: The size, modification time and BLAKE2 hash of the file.
+        :rtype: dict
+        :raises FileNotFoundError: If the specified CSV file does not exist.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.filepath, mode='rb') as file:
+            while block := file.read(1 << 20):
+                digest.update(block)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+    def _read_snapshot(self) -> List[Tuple[int, Address | AddressRecord]]:
+        """
+        Loads the entries from the snapshot if it matches the CSV file, otherwise parses the file and writes a new
+        snapshot. A snapshot written in trusted mode is only used in trusted mode, as its entries weren't validated.
+        A snapshot that can't be read, e.g. one written in an older format, is reported and replaced.
+
+        The snapshot is a line with the JSON header (the file key, SNAPSHOT_VERSION and whether the entries were
+        validated) followed by a JSON array of the entries, each a list of the ID and the FIELDS values.
+
+        :return: The (ID, address) pairs.
+        :rtype: List[Tuple[int, Address | AddressRecord]]
+        :raises FileNotFoundError: If the specified CSV file does not exist.
+        """
+        stat = os.stat(self.filepath)
+        key = None
+        try:
+            with open(self._snapshot_path(), mode='r', encoding='utf-8') as file:
+                header = json.loads(file.readline())
+                if (header['version'], header['size'], header['mtime_ns']) == \
+                        (self.SNAPSHOT_VERSION, stat.st_size, stat.st_mtime_ns) and \
+                        (header['validated'] or self.trusted):
+                    key = self._file_key(stat)
+                    if header['hash'] == key['hash']:
+                        entry_type = AddressRecord if self.records else Address
+                        return [(int(row[0]), entry_type.from_trusted(**dict(zip(self.FIELDS, row[1:], strict=True))))
+                                for row in json.load(file)]
         except FileNotFoundError:
-            print(f"File {self.filepath} not found. Initializing empty dictionary.")
-            self.addresses = {}
+            pass
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Error reading snapshot {self._snapshot_path()}: {e}")
+
+        key = key or self._file_key(stat)
+        entries = list(self._read_entries())
+        header = {**key, 'version': self.SNAPSHOT_VERSION, 'validated': not self.trusted}
+        try:
+            descriptor, temp_path = tempfile.mkstemp(dir=path.dirname(path.abspath(self.filepath)),
+                                                     prefix=path.basename(self._snapshot_path()) + '.', suffix='.tmp')
+            try:
+                with open(descriptor, mode='w', encoding='utf-8') as file:
+                    file.write(json.dumps(header) + '\n')
+                    json.dump([[id_, *(getattr(address, field) for field in self.FIELDS)] for id_, address in entries],
+                              file, separators=(',', ':'), default=date.isoformat)
+                os.replace(temp_path, self._snapshot_path())
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as e:
+            print(f"Error writing snapshot {self._snapshot_path()}: {e}")
+        return entries
+
+    def _read_parallel(self) -> List[Tuple[int, Address | AddressRecord]]:
+        """
+        Reads the CSV file in a pool of worker processes, each parsing and validating one byte range of records.
+        Rows that fail validation are reported and skipped, like in _read_file.
+
+        :return: The (ID, address) pairs sorted by ID; of entries with the same ID the last one in the file wins.
+        :rtype: List[Tuple[int, Address | AddressRecord]]
+        :raises FileNotFoundError: If the specified CSV file does not exist.
+        """
+        fieldnames, ranges = self._split_file(self.workers * 2)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(_parse_range, self.filepath, fieldnames, start, end, self.trusted,
+                                       self.records) for start, end in ranges]
+            entries = []
+            for future in futures:
+                chunk, errors = future.result()
+                for id_, message in errors:
+                    print(f"Error loading address with ID {id_}: {message}")
+                entries.extend(chunk)
+        entries.sort(key=lambda entry: entry[0])  # Stable, so duplicates keep their file order.
+        return entries
+
+    def _split_file(self, parts: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """
+        Splits the records of the CSV file into about equally large byte ranges. A range ends at the first line
+        break after its target size that is outside of quotes; as quotes inside quoted fields are doubled, that is
+        the case when the number of quotes before it is even.
+
+        :param int parts: The number of ranges to aim for.
+        :return: The field names of the header and the (start, end) offsets of the ranges.
+        :rtype: Tuple[List[str], List[Tuple[int, int]]]
+        :raises FileNotFoundError: If the specified CSV file does not exist.
+        """
+        size = path.getsize(self.filepath)
+        with open(self.filepath, mode='rb') as file:
+            header = file.readline()
+            fieldnames = next(csv.reader([header.decode('utf-8')]))
+            boundaries = [file.tell()]
+            position, quotes = boundaries[0], 0
+            for part in range(1, parts):
+                target = boundaries[0] + (size - boundaries[0]) * part // parts
+                if target <= position:
+                    continue
+                file.seek(position)
+                while position < target:
+                    block = file.read(min(1 << 24, target - position))
+                    quotes += block.count(b'"')
+                    position += len(block)
+                while line := file.readline():
+                    quotes += line.count(b'"')
+                    position += len(line)
+                    if quotes % 2 == 0:
+                        break
+                if position < size:
+                    boundaries.append(position)
+            boundaries.append(size)
+        return fieldnames, [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+    def _row_to_address(self, row: Dict[str, str]) -> Address | AddressRecord:
+        """
+        Converts a row of the CSV file into an Address, or an AddressRecord in records mode.
+        In trusted mode the validation is skipped.
+
+        :param Dict[str, str] row: The row as read by csv.DictReader.
+        :return: The address entry.
+        :rtype: Address | AddressRecord
+        :raises ValidationError: If the row is no valid address.
+        """
+        # Ensure no leading/trailing spaces in the emails
+        row['email'] = row['email'].strip() if row['email'] else ''
+        if self.trusted:
+            entry_type = AddressRecord if self.records else Address
+            return entry_type.from_trusted(row['firstname'], row['lastname'], row.get('street'), row.get('number'),
+                                           row['postal_code'], row.get('place'), row.get('birthdate'),
+                                           row.get('phone'), row['email'])
+        address = Address(
+            firstname=row['firstname'],
+            lastname=row['lastname'],
+            street=row.get('street'),
+            number=row.get('number'),
+            postal_code=int(row['postal_code']) if row['postal_code'] else None,
+            place=row.get('place'),
+            birthdate=row.get('birthdate') or None,
+            phone=row.get('phone'),
+            email=row['email']
+        )
+        return AddressRecord.from_address(address) if self.records else address
 
     def save(self):
         """
         Saves the current address entries back into the CSV file, overwriting the previous contents.
+        Does nothing if nothing has changed since the last load or save and the file exists.
+
+        In journal mode only the changes since the last save are appended to the journal; the CSV file is rewritten
+        by compact when it does not exist yet or the journal has grown beyond journal_threshold entries.
+        Inside a transaction the save is deferred until the transaction ends.
+        """
+        if self._undo is not None or not self.dirty and path.exists(self.filepath):
+            return
+        if not self.journal:
+            self._write_csv()
+        elif not path.exists(self.filepath) or self._journal_entries + len(self._pending) > self.journal_threshold:
+            self.compact()
+        elif self._pending:
+            with open(self._journal_path(), mode='a', encoding='utf-8') as file:
+                file.writelines(json.dumps(entry, default=str) + '\n' for entry in self._pending)
+            self._journal_entries += len(self._pending)
+            self._pending.clear()
+        self.dirty = False
+        self.modified_ids.clear()
+
+    def compact(self):
+        """
+        Writes all address entries to the CSV file and removes the journal, whose changes are contained in it.
+        """
+        self._materialize()
+        self._write_csv()
+        if path.exists(self._journal_path()):
+            os.remove(self._journal_path())
+        self._journal_entries = 0
+        self._pending.clear()
+        self.dirty = False
+        self.modified_ids.clear()
+
+    def _write_csv(self):
+        """
+        Writes all address entries to the CSV file, overwriting the previous contents.
+        The entries are written to a temporary file first, which then atomically replaces the CSV file, so readers
+        and crashes never see a half-written file.
         """
         if not path.exists(self.filepath):
             print(f"File not found. Creating new CSV-File: {self.filepath}")
 
-        with open(self.filepath, mode='w', newline='', encoding='utf-8') as file:
-            fieldnames = ['id', 'firstname', 'lastname', 'street', 'number', 'postal_code', 'place', 'birthdate',
-                          'phone', 'email']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()  # This writes the header
-            for id_, address in self.addresses.items():
-                writer.writerow({
-                    'id': id_,
-                    'firstname': address.firstname,
-                    'lastname': address.lastname,
-                    'street': address.street,
-                    'number': address.number,
-                    'postal_code': address.postal_code,
-                    'place': address.place,
-                    'birthdate': address.birthdate,
-                    'phone': address.phone,
-                    'email': address.email
-                })
+        descriptor, temp_path = tempfile.mkstemp(dir=path.dirname(path.abspath(self.filepath)),
+                                                 prefix=path.basename(self.filepath) + '.', suffix='.tmp')
+        try:
+            with open(descriptor, mode='w', newline='', encoding='utf-8') as file:
+                self._write_rows(file)
+            if path.exists(self.filepath):
+                shutil.copymode(self.filepath, temp_path)
+            else:
+                # mkstemp creates the file private, a new book gets the permissions open() would give it.
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temp_path, 0o666 & ~umask)
+            os.replace(temp_path, self.filepath)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _write_rows(self, file):
+        """
+        Writes the header and all address entries as CSV to an open file.
+
+        :param file: The file to write to.
+        """
+        fieldnames = ['id', *self.FIELDS]
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()  # This writes the header
+        for id_, address in self.addresses.items():
+            writer.writerow({
+                'id': id_,
+                'firstname': address.firstname,
+                'lastname': address.lastname,
+                'street': address.street,
+                'number': address.number,
+                'postal_code': address.postal_code,
+                'place': address.place,
+                'birthdate': address.birthdate,
+                'phone': address.phone,
+                'email': address.email
+            })
 
     def close(self):
         """
-        Clears the internal dictionary of addresses, releasing any memory or resources.
+        Saves pending changes and clears the internal dictionary of addresses, releasing any memory or resources.
         """
         self.save()
+        if self._offset_index is not None:
+            self._offset_index.close()
+            self._offset_index = None
+            self._lazy_changes = {}
+        self._clear()
+        self.modified_ids.clear()
+
+    def _drop_indexes(self):
+        """
+        Drops the indexes built on demand, so they are rebuilt from the address entries when they are next used.
+        """
+        self._duplicate_index = None
+        self._field_indexes.clear()
+        self._sorted_keys.clear()
+        self._trigram_indexes.clear()
+        self._phonetic_index = None
+        self._birthday_index = None
+
+    def _clear(self):
+        """
+        Removes all address entries, empties the indexes and resets the ID allocator, so the next book opened on
+        this instance starts its numbering from its own entries.
+        """
         self.addresses.clear()
+        self._drop_indexes()
+        self._sorted_ids.clear()
+        self._next_id = 1
+        self._journal_entries = 0
 
     def search(self, field: str, search_string: str) -> Dict[int, Address]:
         """
         Searches for a string in the specified field of the address entries.
+        The comparison is an exact, case-insensitive match answered from the index of the field.
 
         :param str field: The field to search within (e.g., "firstname", "lastname", "email").
         :param str search_string: The string to search for in the field.
@@ -109,12 +538,118 @@ class AddressDatabaseCSV(AddressContainerInterface):
 
         :raises ValueError: If the specified field does not exist in AddressBook.
         """
+        self._materialize()
+        return {id_: self.addresses[id_] for id_ in self._search_ids(field, search_string)}
+
+    def _search_ids(self, field: str, search_string: str) -> List[int]:
+        """
+        Looks up the IDs of the entries whose field matches the search string in the index of the field.
+
+        :param str field: The field to search within.
+        :param str search_string: The string to search for in the field.
+        :return: The IDs of the matching entries in ascending order. The list belongs to the index, don't modify it.
+        :rtype: List[int]
+        :raises ValueError: If the specified field does not exist in AddressBook.
+        """
+        if field not in self.FIELDS:
+            raise ValueError(f"Invalid field: '{field}'. Must be one of {list(self.FIELDS)}.")
+        index = self._field_indexes.get(field)
+        if index is None:
+            index = self._build_field_index(field)
+        return index.get(self._search_key(search_string), [])
+
+    def search_page(self, field: str, search_string: str, limit: int, after_id: int = 0) -> Dict[int, Address]:
+        """
+        Returns one page of the results of search, ordered by ID. The IDs in the field index are kept sorted, so
+        the page is located by bisecting them and its cost does not depend on the number of matches.
+
+        :param str field: The field to search within (e.g., "firstname", "lastname", "email").
+        :param str search_string: The string to search for in the field.
+        :param int limit: The maximum number of entries on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit matching entries with IDs greater than after_id.
+        :rtype: Dict[int, Address]
+        :raises ValueError: If the specified field does not exist in AddressBook.
+        """
+        self._materialize()
+        ids = self._search_ids(field, search_string)
+        start = bisect_right(ids, after_id)
+        return {id_: self.addresses[id_] for id_ in ids[start:start + limit]}
+
+    def prefix_search(self, field: str, prefix: str, limit: int = 10) -> Dict[int, Address]:
+        """
+        Returns the address entries whose field starts with the prefix, compared casefolded like search.
+        The first matching key is found by bisecting the sorted keys of the field index, so the cost depends on
+        limit and not on the size of the address book.
+
+        :param str field: The field to search within (e.g., "firstname", "lastname", "email").
+        :param str prefix: The beginning of the field value.
+        :param int limit: The maximum number of entries to return.
+        :return: A dictionary of at most limit matching entries, ordered by field value and ID.
+        :rtype: Dict[int, Address]
+        :raises ValueError: If the specified field does not exist in AddressBook.
+        """
+        self._materialize()
+        if field not in self.FIELDS:
+            raise ValueError(f"Invalid field: '{field}'. Must be one of {list(self.FIELDS)}.")
+        index = self._field_indexes.get(field)
+        if index is None:
+            index = self._build_field_index(field)
+        keys = self._sorted_keys.get(field)
+        if keys is None:
+            keys = self._sorted_keys[field] = sorted(index)
+        prefix = self._search_key(prefix)
         result = {}
-        for id_, address in self.addresses.items():
-            if getattr(address, field, "").lower() == search_string.lower():
-                result[id_] = address
+        for position in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[position]
+            if not key.startswith(prefix) or len(result) >= limit:
+                break
+            for id_ in index[key][:limit - len(result)]:
+                result[id_] = self.addresses[id_]
         return result
 
+    def fuzzy_search(self, field: str, search_string: str, threshold: float = 0.3,
+                     limit: int = 10) -> Dict[int, Address]:
+        """
+        Returns the address entries whose field is similar to the search string, tolerating typos and spelling
+        variants. The candidates are the entries sharing trigrams with the search string, looked up in the trigram
+        index of the field.
+
+        :param str field: The field to search within, one of Trigram.FIELDS.
+        :param str search_string: The string to search for in the field.
+        :param float threshold: The minimum trigram similarity of a match, from 0 to 1.
+        :param int limit: The maximum number of entries to return.
+        :return: A dictionary of at most limit matching entries, most similar first.
+        :rtype: Dict[int, Address]
+        :raises ValueError: If the field can't be searched fuzzily.
+        """
+        self._materialize()
+        if field not in Trigram.FIELDS:
+            raise ValueError(f"Invalid field: '{field}'. Must be one of {list(Trigram.FIELDS)}.")
+        index = self._trigram_indexes.get(field)
+        if index is None:
+            index = self._build_trigram_index(field)
+        return {id_: self.addresses[id_] for id_, _ in index.search(search_string, threshold, limit)}
+
+    def search_phonetic(self, name: str, encoder: str = "cologne") -> Dict[int, Address]:
+        """
+        Returns the address entries whose firstname or lastname sounds like the name, i.e. has the same phonetic
+        code. The codes of the entries are computed once, on the first search, and kept up to date afterwards, so
+        a search only encodes the name and looks it up in the index.
+
+        :param str name: The name to search for.
+        :param str encoder: The phonetic encoder, one of Phonetic.ENCODERS.
+        :return: A dictionary of the matching entries, ordered by ID.
+        :rtype: Dict[int, Address]
+        :raises ValueError: If the encoder is unknown.
+        """
+        code = Phonetic.encoder(encoder)(name)
+        self._materialize()
+        index = self._phonetic_index
+        if index is None:
+            index = self._build_phonetic_index()
+        return {id_: self.addresses[id_] for id_ in index.get((encoder, code), [])}
+
     def delete(self, id_: int) -> Optional[int]:
         """
         Deletes the address entry with the specified ID.
@@ -123,7 +658,11 @@ class AddressDatabaseCSV(AddressContainerInterface):
         :return: The ID of the deleted entry, or None if the ID was not found.
         :rtype: int or None
         """
-        return self.addresses.pop(id_, None)
+        self._materialize()
+        address = self._remove(id_)
+        if address is not None:
+            self._record({'op': 'delete', 'id': id_}, undo=lambda: self._insert(id_, address))
+        return address
 
     def update(self, id_: int, **kwargs) -> int:
         """
@@ -136,29 +675,114 @@ class AddressDatabaseCSV(AddressContainerInterface):
         :rtype: int
         :raises KeyError: If the ID does not exist in the address book.
         """
+        self._materialize()
         if id_ in self.addresses:
-            for key, value in kwargs.items():
-                if hasattr(self.addresses[id_], key):
-                    setattr(self.addresses[id_], key, value)
+            fields = {key: value for key, value in kwargs.items() if key in self.FIELDS}
+            previous = {key: getattr(self.addresses[id_], key) for key in fields}
+            self._assign(id_, fields)
+            self._record({'op': 'update', 'id': id_, 'fields': fields}, undo=lambda: self._assign(id_, previous))
             return id_
         else:
             raise KeyError(f"No address found with ID {id_}")
 
+    def _assign(self, id_: int, fields: dict):
+        """
+        Sets fields of a stored address entry and keeps the indexes in sync.
+
+        :param int id_: The ID of the address entry.
+        :param dict fields: The field names and their new values.
+        """
+        address = self.addresses[id_]
+        self._unindex_address(id_, address)
+        if self.records:
+            address = address._replace(**fields)
+            self.addresses[id_] = address
+        else:
+            for key, value in fields.items():
+                setattr(address, key, value)
+        self._index_address(id_, address)
+
+    def _remove(self, id_: int) -> Optional[Address | AddressRecord]:
+        """
+        Removes a stored address entry and its index entries.
+
+        :param int id_: The ID of the address entry.
+        :return: The removed entry, or None if the ID was not found.
+        :rtype: Address | AddressRecord | None
+        """
+        address = self.addresses.pop(id_, None)
+        if address is not None:
+            self._unindex_address(id_, address)
+            del self._sorted_ids[bisect_left(self._sorted_ids, id_)]
+        return address
+
     def add_address(self, address: Address) -> int:
         """
-        Adds a new address entry to the address book.
+        Adds a new address entry to the address book. In records mode it is stored as an AddressRecord.
 
         :param address: The AddressBook instance to add.
         :type address: Address
         :return: The new ID of the added address entry, or -1 if the entry is a duplicate.
         :rtype: int
         """
+        self._materialize()
         if self.is_duplicate(address):
             return -1
-        new_id = max(self.addresses.keys(), default=0) + 1
+        if self.records and not isinstance(address, AddressRecord):
+            address = AddressRecord.from_address(address)
+        new_id = self._next_id
+        self._next_id += 1
         self.addresses[new_id] = address
+        self._sorted_ids.append(new_id)  # New IDs are always the highest
+        self._index_address(new_id, address)
+        self._record({'op': 'add', 'id': new_id, 'fields': {field: getattr(address, field) for field in self.FIELDS}},
+                     undo=lambda: self._remove(new_id))
         return new_id
 
+    def add_addresses(self, addresses: Iterable[Address | dict]) -> List[int]:
+        """
+        Adds several address entries to the address book in a single pass.
+
+        :param addresses: The Address instances or dictionaries with address fields to add.
+        :type addresses: Iterable[Address | dict]
+        :return: For every item the new ID, -1 if it is a duplicate or 0 if it was rejected.
+        :rtype: List[int]
+        """
+        result = []
+        for address in addresses:
+            address = self._coerce_address(address)
+            result.append(0 if address is None else self.add_address(address))
+        return result
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups changes into one unit: saves inside the block are deferred and the address book is saved once when
+        the outermost block exits. If the block raises an exception, all changes made within it are reverted.
+        Transactions can be nested; a failing inner block only reverts its own changes.
+
+        :return: A context manager yielding this address book.
+        """
+        self._materialize()
+        outermost = self._undo is None
+        if outermost:
+            self._undo = []
+            state = self.dirty, set(self.modified_ids)
+        undo_mark, pending_mark = len(self._undo), len(self._pending)
+        try:
+            yield self
+        except BaseException:
+            while len(self._undo) > undo_mark:
+                self._undo.pop()()
+            del self._pending[pending_mark:]
+            if outermost:
+                self._undo = None
+                self.dirty, self.modified_ids = state
+            raise
+        if outermost:
+            self._undo = None
+            self.save()
+
     def get_all(self) -> Dict[int, Address]:
         """
         Returns all address entries as a dictionary.
@@ -166,8 +790,67 @@ class AddressDatabaseCSV(AddressContainerInterface):
         :return: A dictionary of all address entries, keyed by ID.
         :rtype: Dict[int, Address]
         """
+        self._materialize()
         return self.addresses
 
+    def iter_addresses(self, batch_size: int = 1000) -> Iterator[Tuple[int, Address]]:
+        """
+        Streams the address entries stored in the CSV file without loading them into the address dictionary.
+        The file is read batch_size rows at a time, so memory use stays constant.
+        Only the saved state is read; unsaved changes in the address dictionary are not included. In journal mode
+        the changes saved to the journal are applied to the rows on the fly, and entries added there follow the
+        rows of the file.
+
+        :param int batch_size: The maximum number of rows read at once.
+        :return: An iterator of (ID, Address) pairs in file order.
+        :rtype: Iterator[Tuple[int, Address]]
+        """
+        changes = self._read_journal() if self.journal else {}
+        try:
+            for id_, address in self._read_file(batch_size):
+                if id_ in changes:
+                    address = self._replay_entries(id_, address, changes.pop(id_))
+                if address is not None:
+                    yield id_, address
+        except FileNotFoundError:
+            print(f"File {self.filepath} not found.")
+        for id_ in sorted(changes):
+            address = self._replay_entries(id_, None, changes[id_])
+            if address is not None:
+                yield id_, address
+
+    def iter_search(self, field: str, search_string: str, batch_size: int = 1000) -> Iterator[Tuple[int, Address]]:
+        """
+        Streams the address entries of the CSV file whose field matches the search string, using the same exact,
+        case-insensitive comparison as search. Like iter_addresses, only the saved state of the file is read.
+
+        :param str field: The field to search within (e.g., "firstname", "lastname", "email").
+        :param str search_string: The string to search for in the field.
+        :param int batch_size: The maximum number of rows read at once.
+        :return: An iterator of (ID, Address) pairs of the matching entries.
+        :rtype: Iterator[Tuple[int, Address]]
+        :raises ValueError: If the specified field does not exist in AddressBook.
+        """
+        if field not in self.FIELDS:
+            raise ValueError(f"Invalid field: '{field}'. Must be one of {list(self.FIELDS)}.")
+        key = self._search_key(search_string)
+        return ((id_, address) for id_, address in self.iter_addresses(batch_size)
+                if self._search_key(getattr(address, field)) == key)
+
+    def get_page(self, limit: int, after_id: int = 0) -> Dict[int, Address]:
+        """
+        Returns one page of all address entries, ordered by ID. The page is located by bisecting the ordered ID
+        index, so its cost does not depend on how far the page is into the address book.
+
+        :param int limit: The maximum number of entries on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit entries with IDs greater than after_id.
+        :rtype: Dict[int, Address]
+        """
+        self._materialize()
+        start = bisect_right(self._sorted_ids, after_id)
+        return {id_: self.addresses[id_] for id_ in self._sorted_ids[start:start + limit]}
+
     def get(self, id_: int) -> Optional[Address]:
         """
         Retrieves the address entry with the specified ID.
@@ -177,8 +860,29 @@ class AddressDatabaseCSV(AddressContainerInterface):
         :return: The Address object, or None if the ID was not found.
         :rtype: Address, optional
         """
+        if self._offset_index is not None:
+            return self._lazy_get(id_)
         return self.addresses.get(id_)
 
+    def _lazy_get(self, id_: int) -> Optional[Address | AddressRecord]:
+        """
+        Parses the row with the given ID from the lazily opened file and applies its changes from the journal.
+
+        :param int id_: The ID of the address entry.
+        :return: The address entry, or None if the ID was not found or its row is invalid.
+        :rtype: Address | AddressRecord | None
+        """
+        row = self._offset_index.row(id_)
+        address = None
+        if row is not None:
+            try:
+                address = self._row_to_address(row)
+            except ValidationError as e:
+                print(f"Error loading address with ID {id_}: {e}")
+        if id_ in self._lazy_changes:
+            address = self._replay_entries(id_, address, self._lazy_changes[id_])
+        return address
+
     def get_todays_birthdays(self) -> Dict[int, Address]:
         """
         Returns all address entries where today is the person's birthday.
@@ -186,24 +890,331 @@ class AddressDatabaseCSV(AddressContainerInterface):
         :return: A dictionary of address entries with today's birthday, keyed by their IDs.
         :rtype: Dict[int, Address]
         """
-        result = {}
-        today = date.today().strftime("%m-%d")
-        for id_, address in self.addresses.items():
-            if address.birthdate and address.birthdate[5:] == today:
-                result[id_] = address
-        return result
+        self._materialize()
+        today = date.today()
+        index = self._birthday_index
+        if index is None:
+            index = self._build_birthday_index()
+        ids = index.get((today.month, today.day), ())
+        return {id_: self.addresses[id_] for id_ in sorted(ids)}
 
     def is_duplicate(self, address: Address) -> bool:
         """
         Checks if an address entry is a duplicate by comparing its firstname, lastname, and email with existing entries.
+        The check is a single lookup in the duplicate index and does not depend on the size of the address book.
 
         :param address: The Address instance to check for duplicates.
         :return: True if the address entry is a duplicate, otherwise False.
         :rtype: bool
         """
-        for existing in self.addresses.values():
-            if (existing.firstname == address.firstname and
-                    existing.lastname == address.lastname and
-                    existing.email == address.email):
-                return True
-        return False
\ No newline at end of file
+        self._materialize()
+        index = self._duplicate_index
+        if index is None:
+            index = self._build_duplicate_index()
+        return bool(index.get(self._duplicate_key(address)))
+
+    def _journal_path(self) -> str:
+        """
+        Returns the path of the journal belonging to the CSV file.
+
+        :return: The path of the journal.
+        :rtype: str
+        """
+        return self.filepath + '.journal'
+
+    def _record(self, entry: dict, undo: Callable[[], None]):
+        """
+        Marks the address book as changed and, in journal mode, remembers the change for the next save.
+        Inside a transaction the function reverting the change is kept for a rollback.
+
+        :param dict entry: The change, with the operation, the ID and the changed fields.
+        :param Callable[[], None] undo: A function reverting the change.
+        """
+        self.dirty = True
+        self.modified_ids.add(entry['id'])
+        if self.journal:
+            self._pending.append(entry)
+        if self._undo is not None:
+            self._undo.append(undo)
+
+    def _replay_journal(self):
+        """
+        Applies the changes recorded in the journal to the loaded address entries.
+        Entries that cannot be read, like a line cut off by a crash while saving, are reported and skipped.
+        """
+        changes = self._read_journal()
+        for id_, entries in changes.items():
+            address = self._replay_entries(id_, self.addresses.get(id_), entries)
+            if address is None:
+                self._remove(id_)
+            else:
+                self._insert(id_, address)
+            # IDs added and deleted again within the journal must not be handed out again either.
+            self._next_id = max(self._next_id, id_ + 1)
+        self._journal_entries = sum(len(entries) for entries in changes.values())
+        self._pending.clear()
+
+    def _read_journal(self) -> Dict[int, List[dict]]:
+        """
+        Reads the journal and groups its entries by the ID they change, keeping their order.
+        Entries that cannot be read are reported and skipped.
+
+        :return: The journal entries of every changed ID.
+        :rtype: Dict[int, List[dict]]
+        """
+        changes: Dict[int, List[dict]] = {}
+        try:
+            with open(self._journal_path(), mode='r', encoding='utf-8') as file:
+                for line_number, line in enumerate(file, start=1):
+                    try:
+                        entry = json.loads(line)
+                        changes.setdefault(int(entry['id']), []).append(entry)
+                    except (ValueError, KeyError, TypeError) as e:
+                        print(f"Error reading journal entry {line_number}: {e}")
+        except FileNotFoundError:
+            pass
+        return changes
+
+    def _replay_entries(self, id_: int, address: Optional[Address | AddressRecord],
+                        entries: List[dict]) -> Optional[Address | AddressRecord]:
+        """
+        Applies the journal entries of one ID to its address entry. Added and updated entries are created through
+        _fields_to_address, so they are validated like entries read from the CSV file.
+        Entries that cannot be applied are reported and skipped.
+
+        :param int id_: The ID the entries belong to.
+        :param address: The address entry before the changes, or None if there is none.
+        :type address: Address | AddressRecord | None
+        :param List[dict] entries: The journal entries of the ID in the order they were saved.
+        :return: The address entry after the changes, or None if it does not exist afterwards.
+        :rtype: Address | AddressRecord | None
+        """
+        for entry in entries:
+            try:
+                if entry['op'] == 'add':
+                    address = self._fields_to_address(entry['fields'])
+                elif entry['op'] == 'update':
+                    if address is None:
+                        raise KeyError(f"No address found with ID {id_}")
+                    fields = {field: getattr(address, field) for field in self.FIELDS}
+                    address = self._fields_to_address({**fields, **entry['fields']})
+                elif entry['op'] == 'delete':
+                    address = None
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Error replaying journal entry for ID {id_}: {e}")
+        return address
+
+    def _fields_to_address(self, fields: dict) -> Address | AddressRecord:
+        """
+        Creates an address entry from the fields of a journal entry.
+
+        :param dict fields: The address fields.
+        :return: The address entry, an AddressRecord in records mode.
+        :rtype: Address | AddressRecord
+        :raises ValidationError: If the fields are no valid address.
+        """
+        if self.trusted:
+            return (AddressRecord if self.records else Address).from_trusted(**fields)
+        address = Address(**fields)
+        return AddressRecord.from_address(address) if self.records else address
+
+    @staticmethod
+    def _duplicate_key(address: Address) -> Tuple:
+        """
+        Builds the key under which an address is stored in the duplicate index.
+
+        :param Address address: The address to build the key for.
+        :return: A tuple of firstname, lastname and email.
+        :rtype: Tuple
+        """
+        return address.firstname, address.lastname, address.email
+
+    @staticmethod
+    def _search_key(value) -> Optional[str]:
+        """
+        Normalizes a field value for the case-insensitive field indexes.
+
+        :param value: The field value.
+        :return: The casefolded string form of the value, or None for empty fields.
+        :rtype: str or None
+        """
+        if value is None:
+            return None
+        return str(value).casefold()
+
+    def _build_field_index(self, field: str) -> Dict[str, Set[int]]:
+        """
+        Builds the search index of a field from all loaded address entries.
+
+        :param str field: The field to index.
+        :return: The new index, mapping casefolded field values to sorted IDs.
+        :rtype: Dict[str, List[int]]
+        """
+        with self._build_lock:
+            if field in self._field_indexes:
+                return self._field_indexes[field]
+            index: Dict[str, List[int]] = {}
+            for id_ in self._sorted_ids:
+                key = self._search_key(getattr(self.addresses[id_], field))
+                if key is not None:
+                    index.setdefault(key, []).append(id_)
+            # Published only once complete, as concurrent readers look it up without the lock.
+            self._field_indexes[field] = index
+            return index
+
+    def _build_trigram_index(self, field: str) -> Trigram.TrigramIndex:
+        """
+        Builds the trigram index of a field from all loaded address entries.
+
+        :param str field: The field to index, one of Trigram.FIELDS.
+        :return: The new index.
+        :rtype: Trigram.TrigramIndex
+        """
+        with self._build_lock:
+            if field in self._trigram_indexes:
+                return self._trigram_indexes[field]
+            index = Trigram.TrigramIndex()
+            for id_, address in self.addresses.items():
+                index.add(id_, getattr(address, field))
+            self._trigram_indexes[field] = index
+            return index
+
+    def _build_duplicate_index(self) -> Dict[Tuple, Set[int]]:
+        """
+        Builds the duplicate index from all loaded address entries.
+
+        :return: The new index, mapping duplicate keys to IDs.
+        :rtype: Dict[Tuple, Set[int]]
+        """
+        with self._build_lock:
+            if self._duplicate_index is not None:
+                return self._duplicate_index
+            index: Dict[Tuple, Set[int]] = {}
+            for id_, address in self.addresses.items():
+                index.setdefault(self._duplicate_key(address), set()).add(id_)
+            self._duplicate_index = index
+            return index
+
+    def _build_birthday_index(self) -> Dict[Tuple[int, int], Set[int]]:
+        """
+        Builds the birthday index from all loaded address entries.
+
+        :return: The new index, mapping (month, day) to IDs.
+        :rtype: Dict[Tuple[int, int], Set[int]]
+        """
+        with self._build_lock:
+            if self._birthday_index is not None:
+                return self._birthday_index
+            index: Dict[Tuple[int, int], Set[int]] = {}
+            for id_, address in self.addresses.items():
+                month_day = self._month_day(address.birthdate)
+                if month_day is not None:
+                    index.setdefault(month_day, set()).add(id_)
+            self._birthday_index = index
+            return index
+
+    def _build_phonetic_index(self) -> Dict[Tuple[str, str], List[int]]:
+        """
+        Builds the phonetic index from the names of all loaded address entries.
+
+        :return: The new index, mapping (encoder, code) to sorted IDs.
+        :rtype: Dict[Tuple[str, str], List[int]]
+        """
+        with self._build_lock:
+            if self._phonetic_index is not None:
+                return self._phonetic_index
+            index: Dict[Tuple[str, str], List[int]] = {}
+            for id_ in self._sorted_ids:
+                address = self.addresses[id_]
+                for key in Phonetic.codes(address.firstname, address.lastname):
+                    index.setdefault(key, []).append(id_)
+            self._phonetic_index = index
+            return index
+
+    @staticmethod
+    def _month_day(birthdate) -> Optional[Tuple[int, int]]:
+        """
+        Returns the bucket of a birthdate in the birthday index.
+
+        :param birthdate: The birthdate as date or 'YYYY-MM-DD' string.
+        :return: A (month, day) tuple, or None if the birthdate is empty or invalid.
+        :rtype: Tuple[int, int] or None
+        """
+        if isinstance(birthdate, str):
+            try:
+                birthdate = date.fromisoformat(birthdate)
+            except ValueError:
+                return None
+        if not isinstance(birthdate, date):
+            return None
+        return birthdate.month, birthdate.day
+
+    def _index_address(self, id_: int, address: Address):
+        """
+        Registers an address entry in the internal indexes.
+
+        :param int id_: The ID of the address entry.
+        :param Address address: The address entry to register.
+        """
+        if self._duplicate_index is not None:
+            self._duplicate_index.setdefault(self._duplicate_key(address), set()).add(id_)
+        month_day = self._month_day(address.birthdate)
+        if month_day is not None and self._birthday_index is not None:
+            self._birthday_index.setdefault(month_day, set()).add(id_)
+        for field, index in self._field_indexes.items():
+            key = self._search_key(getattr(address, field))
+            if key is not None:
+                if key not in index and field in self._sorted_keys:
+                    insort(self._sorted_keys[field], key)
+                insort(index.setdefault(key, []), id_)
+        for field, index in self._trigram_indexes.items():
+            index.add(id_, getattr(address, field))
+        if self._phonetic_index is not None:
+            for key in Phonetic.codes(address.firstname, address.lastname):
+                insort(self._phonetic_index.setdefault(key, []), id_)
+
+    def _unindex_address(self, id_: int, address: Address):
+        """
+        Removes an address entry from the internal indexes.
+        Must be called before the entry is changed or removed, while its fields still hold the indexed values.
+
+        :param int id_: The ID of the address entry.
+        :param Address address: The address entry to remove.
+        """
+        if self._duplicate_index is not None:
+            key = self._duplicate_key(address)
+            ids = self._duplicate_index.get(key)
+            if ids is not None:
+                ids.discard(id_)
+                if not ids:
+                    del self._duplicate_index[key]
+        if self._birthday_index is not None:
+            month_day = self._month_day(address.birthdate)
+            ids = self._birthday_index.get(month_day)
+            if ids is not None:
+                ids.discard(id_)
+                if not ids:
+                    del self._birthday_index[month_day]
+        for field, index in self._field_indexes.items():
+            key = self._search_key(getattr(address, field))
+            ids = index.get(key)
+            if ids is not None:
+                position = bisect_left(ids, id_)
+                if position < len(ids) and ids[position] == id_:
+                    del ids[position]
+                if not ids:
+                    del index[key]
+                    if field in self._sorted_keys:
+                        keys = self._sorted_keys[field]
+                        del keys[bisect_left(keys, key)]
+        for index in self._trigram_indexes.values():
+            index.remove(id_)
+        if self._phonetic_index is not None:
+            for key in Phonetic.codes(address.firstname, address.lastname):
+                ids = self._phonetic_index.get(key)
+                if ids is not None:
+                    position = bisect_left(ids, id_)
+                    if position < len(ids) and ids[position] == id_:
+                        del ids[position]
+                    if not ids:
+                        del self._phonetic_index[key]
@@ -1,9 +1,32 @@
 from datetime import date
 from AddressBook.AddressContainerInterface import AddressContainerInterface
 from AddressBook.Address import Address
-from typing import Optional
+from AddressBook.AddressRecord import AddressRecord
+from AddressBook.SQLiteConnectionPool import SQLiteConnectionPool
+from AddressBook import Phonetic, Trigram
+from typing import Callable, Optional, Iterable, Iterator
+from contextlib import contextmanager, nullcontext
 from os import path
+import functools
+import re
 import sqlite3
+import threading
+
+
+def _pooled(method: Callable) -> Callable:
+    """
+    Decorate a method of AddressDatabaseSQL to run with a connection checked out of the pool, which is given back
+    when the method returns unless the thread is inside a transaction block.
+
+    :param Callable method: The method to decorate.
+    :return: The decorated method.
+    :rtype: Callable
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._checkout():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class AddressDatabaseSQL(AddressContainerInterface):
@@ -14,17 +37,120 @@ class AddressDatabaseSQL(AddressContainerInterface):
     SQL-Dialect: SQLite.
 
     Functionalities include loading databases and getting, deleting, adding or updating entries.
+
+    Searches across all fields use an FTS5 full-text index kept in sync by triggers, if SQLite was built with FTS5.
+    fuzzy_search uses the trigram table {tablename}_trigrams, which add_address and update fill and a trigger clears
+    on delete. search_phonetic uses the table {tablename}_phonetic of the phonetic name codes, maintained the same way.
+
+    With a pool_size the database can be shared between threads: every method checks a connection out of a
+    SQLiteConnectionPool for its duration, transaction blocks for the whole block, and conn and cursor refer to the
+    connection of the calling thread. Transaction blocks are tracked per thread.
     """
 
-    def __init__(self):
+    COLUMNS = ("firstname", "lastname", "street", "number", "postal_code", "place", "birthdate", "phone", "email")
+
+    #: Named sets of PRAGMAs applied by open(). durable keeps every commit on disk, balanced may lose the last commits
+    #: on power loss but never corrupts the database, bulk-load trades all durability for insert throughput.
+    PROFILES = {
+        "durable": {"journal_mode": "WAL", "synchronous": "FULL", "cache_size": -8000, "temp_store": "DEFAULT"},
+        "balanced": {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -64000,
+                     "mmap_size": 268435456, "temp_store": "MEMORY"},
+        "bulk-load": {"journal_mode": "MEMORY", "synchronous": "OFF", "cache_size": -256000,
+                      "mmap_size": 1073741824, "temp_store": "MEMORY"},
+    }
+    #: Secondary indexes created by setup_table, name suffix -> columns. They use COLLATE NOCASE, so the
+    #: case-insensitive exact searches (field = ? COLLATE NOCASE) can seek them instead of scanning the table.
+    INDEXES = {
+        "name": ("lastname", "firstname"),
+        "firstname": ("firstname",),
+        "email": ("email",),
+        "phone": ("phone",),
+        "postal_code": ("postal_code",),
+    }
+    #: The columns a replace or merge overwrites, all but the ones identifying a duplicate.
+    _UPDATE_COLUMNS = ("street", "number", "postal_code", "place", "birthdate", "phone")
+    #: What add_address does with an address whose firstname, lastname and email are already stored: ignore
+    #: keeps the stored address, replace overwrites its other fields and merge only overwrites them with the fields
+    #: that are set in the new address.
+    CONFLICT_POLICIES = ("ignore", "replace", "merge")
+    PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "locking_mode", "busy_timeout")
+
+    def __init__(self, trusted: bool = False, records: bool = False, profile: str | dict | None = None,
+                 pool_size: int = 0, on_conflict: str = "ignore"):
         """
         Initialize the AddressDatabaseSQL object with empty filepath connection and cursor object.
         The table name used in the database file is called Address.
+
+        :param bool trusted: Read rows without re-validating them. Only use for databases written by this class.
+        :param bool records: Return read-only AddressRecord tuples instead of Address objects from get, get_all,
+                             search and the other read methods, which needs a fraction of the memory.
+        :param str | dict | None profile: The name of one of the PROFILES or a dictionary of PRAGMA names and values
+                                          applied when the database is opened. None keeps the SQLite defaults.
+        :param int pool_size: The number of connections for use from several threads, 0 for a single connection.
+                              Pooled databases use journal_mode WAL unless the profile sets another journal mode.
+        :param str on_conflict: The default policy for adding duplicates, one of the CONFLICT_POLICIES.
+        :raise ValueError: If the profile is unknown or contains an unsupported PRAGMA, pool_size is negative or
+                           on_conflict is unknown.
         """
         self.filepath = None
+        self.trusted = trusted
+        self.records = records
         self.conn = None
         self.cursor = None
         self.tablename = "addressbook" # NOTE: changed to fit with the given databases
+        self.fts_available = False
+        self.unique_index = False
+        self.on_conflict = self._conflict_policy(on_conflict)
+        if pool_size < 0:
+            raise ValueError(f"Invalid pool size: {pool_size}. Must not be negative.")
+        self.pool_size = pool_size
+        self._pool = None
+        self._local = threading.local()
+        if isinstance(profile, str):
+            if profile not in self.PROFILES:
+                raise ValueError(f"Unknown profile: '{profile}'. Must be one of {list(self.PROFILES)}.")
+            profile = self.PROFILES[profile]
+        for pragma, value in (profile or {}).items():
+            if pragma not in self.PRAGMAS or not re.fullmatch(r"-?\w+", str(value)):
+                raise ValueError(f"Unsupported PRAGMA: {pragma} = {value}")
+        self.pragmas = dict(profile or {})
+
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        """
+        The connection to the database, in pooled mode the one of the calling thread.
+        """
+        if self._pool is not None:
+            return self._pool.connection()
+        return self._conn
+
+    @conn.setter
+    def conn(self, connection: Optional[sqlite3.Connection]):
+        self._conn = connection
+
+    @property
+    def cursor(self) -> Optional[sqlite3.Cursor]:
+        """
+        The shared cursor, in pooled mode the one of the calling thread.
+        """
+        if self._pool is not None:
+            return self._pool.cursor()
+        return self._cursor
+
+    @cursor.setter
+    def cursor(self, cursor: Optional[sqlite3.Cursor]):
+        self._cursor = cursor
+
+    @property
+    def _transaction_depth(self) -> int:
+        """
+        The number of nested transaction blocks the calling thread is in.
+        """
+        return getattr(self._local, "transaction_depth", 0)
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, depth: int):
+        self._local.transaction_depth = depth
 
     def set_filepath(self, filepath: str):
         """
@@ -41,8 +167,10 @@ class AddressDatabaseSQL(AddressContainerInterface):
     def open(self):
         """
         Establish the connection to the SQL-Database file specified by the filepath attribute and
-        creates a cursor object. Calls the setup_table method to create a table (if not already existing)
-        with the name specified by the tablename attribute. Outputs the error in case any occur.
+        creates a cursor object, or the connection pool if pool_size is set. Applies the PRAGMAs of the performance
+        profile. Calls the setup_table method to
+        create a table (if not already existing) with the name specified by the tablename attribute.
+        Outputs the error in case any occur.
 
         :raise sqlite3.Error: Trigger when an error comes from sqlite3
         """
@@ -53,8 +181,14 @@ class AddressDatabaseSQL(AddressContainerInterface):
             if not path.exists(self.filepath):
                 print(f"File not found. Creating new Database: {self.filepath}")
 
-            self.conn = sqlite3.connect(self.filepath)
-            self.cursor = self.conn.cursor()
+            if self.pool_size:
+                pragmas = {"journal_mode": "WAL", **self.pragmas}
+                self._pool = SQLiteConnectionPool(self.filepath, self.pool_size, pragmas)
+            else:
+                self.conn = sqlite3.connect(self.filepath)
+                self.cursor = self.conn.cursor()
+                for pragma, value in self.pragmas.items():
+                    self.cursor.execute(f"PRAGMA {pragma} = {value};")
             self.setup_table()
 
         except sqlite3.Error as e:
@@ -62,55 +196,291 @@ class AddressDatabaseSQL(AddressContainerInterface):
 
     def close(self):
         """
-        Closes the cursor object and the connection to the SQL-Database. Outputs the error in case any occur.
+        Closes the cursor object and the connection to the SQL-Database, or all connections of the pool.
+        Outputs the error in case any occur.
         """
         try:
-            if self.conn:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+            elif self.conn:
                 self.cursor.close()
                 self.conn.close()
         except sqlite3.Error as e:
             print(f"Error Code {e.sqlite_errorcode}: {e.sqlite_errorname}")
 
+    def _checkout(self):
+        """
+        Hold a pooled connection for the calling thread for the duration of the block, see
+        SQLiteConnectionPool.checkout. Does nothing for a single connection.
+
+        :return: A context manager.
+        """
+        return self._pool.checkout() if self._pool is not None else nullcontext()
+
+    def release_connection(self):
+        """
+        In pooled mode, give the connection of the calling thread back to the pool before the thread ends, e.g. at
+        the end of a request handled by a long-lived worker thread. Does nothing for a single connection.
+        """
+        if self._pool is not None:
+            self._pool.release()
+
+    @_pooled
     def save(self):
         """
         Commits all changes done to the SQL-Database. Outputs the error in case any occur.
+        Inside a transaction the commit is deferred until the transaction ends.
         """
         try:
-            self.conn.commit()
+            self._commit()
         except sqlite3.Error as e:
             print(f"Error Code {e.sqlite_errorcode}: {e.sqlite_errorname}")
 
-    def search(self, search_string: str, field: str = "") -> dict[int, Address]:
+    @_pooled
+    def search(self, search_string: str, field: str = "", exact: bool = False) -> dict[int, Address]:
         """
         Search for a given string across all fields of the database and returns matching entries.
         Additionally, takes the field string to restrict the search to a specific field.
-        The Search is done case-insensitive and non-exact (utilizes the LIKE statement with wildcards).
+        The Search is done case-insensitive and non-exact (utilizes the LIKE statement with wildcards), unless exact
+        is set: then the whole field has to match case-insensitively (ASCII letters only), which uses the indexes.
+        Searches across all fields match every word of the search string as a phrase prefix within one column using
+        the full-text index,
+        and only fall back to LIKE if FTS5 is unavailable or the search string contains no words.
 
         :param str search_string: The string to search for across all fields or restricted to one field.
         :param str, optional field: The field to search within (e.g., "firstname", "lastname", "email").
                                    Defaults to an empty string (""), resulting in a search across all fields.
+        :param bool exact: Match whole field values instead of substrings.
         :return: A dictionary containing matching address entries with IDs as keys.
         :rtype: dict[int, Address]
         :raises ValueError: If the specified field is invalid (i.e., not in the allowed columns)
         """
-        columns = ["firstname", "lastname", "street", "number",
-                   "postal_code", "place", "birthdate", "phone", "email"]
+        condition, params = self._search_condition(search_string, field, exact)
+        self.cursor.execute(self._select(condition) + " ORDER BY id;", params)
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    def _search_condition(self, search_string: str, field: str, exact: bool = False) -> tuple[str, list]:
+        """
+        Build the WHERE condition and its parameters used by search, iter_search and search_page.
+
+        :param str search_string: The string to search for across all fields or restricted to one field.
+        :param str field: The field to search within, or an empty string for all fields.
+        :param bool exact: Match whole field values case-insensitively instead of substrings.
+        :return: The condition and its parameters.
+        :rtype: tuple[str, list]
+        :raises ValueError: If the specified field is invalid (i.e., not in the allowed columns)
+        """
+        columns = list(self.COLUMNS)
 
         if field and field not in columns:
             raise ValueError(f"Invalid field: '{field}'. Must be one of {columns}.")
+        elif exact:
+            columns = [field] if field else columns
+            condition = " OR ".join(f"{col} = ? COLLATE NOCASE" for col in columns)
+            return f"({condition})", [search_string] * len(columns)
         elif field:
-            query = (f"SELECT id, firstname, lastname, street, number, postal_code,"
-                     f"place, birthdate, phone, email FROM {self.tablename} WHERE {field} LIKE ?;")
-            self.cursor.execute(query, (f"%{search_string}%",))
+            return f"{field} LIKE ?", [f"%{search_string}%"]
+        # Every whitespace separated word becomes a phrase of its tokens, so e.g. an email only matches in one column.
+        phrases = [" + ".join(f'"{token}"' for token in tokens) + "*"
+                   for tokens in (re.findall(r"\w+", word) for word in search_string.split()) if tokens]
+        if self.fts_available and phrases:
+            return (f"id IN (SELECT rowid FROM {self.tablename}_fts WHERE {self.tablename}_fts MATCH ?)",
+                    [" ".join(phrases)])
+        return "(" + " OR ".join([f"{col} LIKE ?" for col in columns]) + ")", [f"%{search_string}%"] * len(columns)
+
+    def _select(self, condition: str) -> str:
+        """
+        Build a SELECT of the id and all address columns restricted by a condition.
+
+        :param str condition: The WHERE condition.
+        :return: The SELECT statement without ORDER BY and terminating semicolon.
+        :rtype: str
+        """
+        return (f"SELECT id, firstname, lastname, street, number, postal_code, place, birthdate, phone, email "
+                f"FROM {self.tablename} WHERE {condition}")
+
+    @_pooled
+    def search_page(self, field: str, search_string: str, limit: int, after_id: int = 0,
+                    exact: bool = False) -> dict[int, Address]:
+        """
+        Return one page of the results of search, ordered by ID. The page starts with a seek on the primary key
+        (WHERE id > ? ORDER BY id LIMIT ?), so later pages are as fast as the first one.
+
+        :param str field: The field to search within, or an empty string to search across all fields.
+        :param str search_string: The string to search for.
+        :param int limit: The maximum number of addresses on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :param bool exact: Match whole field values instead of substrings, see search.
+        :return: A dictionary of at most limit matching addresses with IDs greater than after_id.
+        :rtype: dict[int, Address]
+        :raises ValueError: If the specified field is invalid (i.e., not in the allowed columns)
+        """
+        condition, params = self._search_condition(search_string, field, exact)
+        self.cursor.execute(self._select(f"{condition} AND id > ?") + " ORDER BY id LIMIT ?;",
+                            [*params, after_id, limit])
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    @_pooled
+    def prefix_search(self, field: str, prefix: str, limit: int = 10) -> dict[int, Address]:
+        """
+        Return the addresses whose field starts with the prefix. The prefix becomes the range
+        field >= prefix AND field < upper bound, compared COLLATE NOCASE, so the case-insensitive INDEXES answer it
+        with a seek and the scan stops after limit rows. Like exact searches, only ASCII letters are compared
+        case-insensitively. NOCASE compares ASCII letters as lower case, so the bound is computed from the lowered
+        prefix, and as incrementing its last character can yield an upper case letter that NOCASE lowers again
+        (e.g. "john@" gives "johnA"), every row in the range is also checked to really start with the prefix.
+
+        :param str field: The field to search within (e.g., "firstname", "lastname", "email").
+        :param str prefix: The beginning of the field value.
+        :param int limit: The maximum number of addresses to return.
+        :return: A dictionary of at most limit matching addresses, ordered by the field value.
+        :rtype: dict[int, Address]
+        :raises ValueError: If the specified field is invalid (i.e., not in the allowed columns)
+        """
+        if field not in self.COLUMNS:
+            raise ValueError(f"Invalid field: '{field}'. Must be one of {list(self.COLUMNS)}.")
+        if prefix:
+            lowered = "".join(char.lower() if "A" <= char <= "Z" else char for char in prefix)
+            # The smallest string greater than every string starting with prefix.
+            upper_bound = lowered[:-1] + chr(ord(lowered[-1]) + 1)
+            condition = (f"{field} >= ? COLLATE NOCASE AND {field} < ? COLLATE NOCASE "
+                         f"AND substr({field}, 1, ?) = ? COLLATE NOCASE")
+            params = [lowered, upper_bound, len(prefix), prefix, limit]
         else:
-            query = (f"SELECT id, firstname, lastname, street, number, postal_code,"
-                     f"place, birthdate, phone, email FROM {self.tablename} WHERE ") + " OR ".join(
-                [f"{col} LIKE ?" for col in columns]
-            ) + ";"
-            search_params = [f"%{search_string}%"] * len(columns)
-            self.cursor.execute(query, search_params)
-        return {elements[0]: Address(*elements[1:]) for elements in self.cursor.fetchall()}
+            condition, params = f"{field} IS NOT NULL", [limit]
+        self.cursor.execute(self._select(condition) + f" ORDER BY {field} COLLATE NOCASE LIMIT ?;", params)
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    @_pooled
+    def fuzzy_search(self, field: str, search_string: str, threshold: float = 0.3,
+                     limit: int = 10) -> dict[int, Address]:
+        """
+        Return the addresses whose field is similar to the search string, tolerating typos and spelling variants.
+        The candidates are the rows sharing enough trigrams with the search string to reach the threshold, counted
+        on the primary key of the trigram table; only they are read and ranked by their exact similarity.
+
+        :param str field: The field to search within, one of Trigram.FIELDS.
+        :param str search_string: The search term to look for.
+        :param float threshold: The minimum trigram similarity of a match, from 0 to 1.
+        :param int limit: The maximum number of addresses to return.
+        :return: A dictionary of at most limit matching addresses, most similar first.
+        :rtype: dict[int, Address]
+        :raises ValueError: If the field can't be searched fuzzily.
+        """
+        if field not in Trigram.FIELDS:
+            raise ValueError(f"Invalid field: '{field}'. Must be one of {list(Trigram.FIELDS)}.")
+        query = Trigram.trigrams(search_string)
+        if not query:
+            return {}
+        placeholders = ", ".join("?" * len(query))
+        self.cursor.execute(self._select(f"id IN (SELECT id FROM {self.tablename}_trigrams "
+                                         f"WHERE field = ? AND trigram IN ({placeholders}) "
+                                         f"GROUP BY id HAVING count(*) >= ?)") + ";",
+                            [field, *query, Trigram.minimum_shared(query, threshold)])
+        position = self.COLUMNS.index(field) + 1
+        matches = []
+        for elements in self.cursor.fetchall():
+            score = Trigram.similarity(query, Trigram.trigrams(elements[position]))
+            if score >= threshold:
+                matches.append((-score, elements[0], elements))
+        matches.sort()
+        return {elements[0]: self._to_address(elements[1:]) for _, _, elements in matches[:limit]}
+
+    def _index_trigrams(self, id_: int):
+        """
+        Rebuild the rows of a stored address in the trigram table from its current field values.
+
+        :param int id_: The ID of the address.
+        :raise sqlite3.Error: If a statement fails.
+        """
+        self.cursor.execute(f"DELETE FROM {self.tablename}_trigrams WHERE id = ?;", (id_,))
+        self.cursor.execute(f"SELECT {', '.join(Trigram.FIELDS)} FROM {self.tablename} WHERE id = ?;", (id_,))
+        row = self.cursor.fetchone()
+        if row is not None:
+            self._insert_trigram_rows(self._trigram_rows(id_, dict(zip(Trigram.FIELDS, row))))
+
+    @staticmethod
+    def _trigram_rows(id_: int, fields: dict) -> list[tuple]:
+        """
+        Compute the rows of an address in the trigram table.
+
+        :param int id_: The ID of the address.
+        :param dict fields: The field values of the address, at least the Trigram.FIELDS.
+        :return: The (field, trigram, id) rows.
+        :rtype: list[tuple]
+        """
+        return [(field, gram, id_) for field in Trigram.FIELDS for gram in Trigram.trigrams(fields[field])]
+
+    def _insert_trigram_rows(self, rows: list[tuple]):
+        """
+        Insert rows into the trigram table with one executemany, in primary key order for locality.
+
+        :param list[tuple] rows: The (field, trigram, id) rows, see _trigram_rows.
+        :raise sqlite3.Error: If the statement fails.
+        """
+        if rows:
+            rows.sort()
+            self.cursor.executemany(f"INSERT INTO {self.tablename}_trigrams (field, trigram, id) VALUES (?, ?, ?);",
+                                    rows)
+
+    @_pooled
+    def search_phonetic(self, name: str, encoder: str = "cologne") -> dict[int, Address]:
+        """
+        Return the addresses whose firstname or lastname sounds like the name, i.e. has the same phonetic code.
+        The codes of the stored names are precomputed, so the search is one lookup on the primary key of the
+        phonetic table.
+
+        :param str name: The name to search for.
+        :param str encoder: The phonetic encoder, one of Phonetic.ENCODERS.
+        :return: A dictionary of the matching addresses, ordered by ID.
+        :rtype: dict[int, Address]
+        :raises ValueError: If the encoder is unknown.
+        """
+        code = Phonetic.encoder(encoder)(name)
+        self.cursor.execute(self._select(f"id IN (SELECT id FROM {self.tablename}_phonetic "
+                                         f"WHERE encoder = ? AND code = ?)") + " ORDER BY id;", (encoder, code))
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    def _index_phonetic(self, id_: int):
+        """
+        Rebuild the rows of a stored address in the phonetic table from its current names.
+
+        :param int id_: The ID of the address.
+        :raise sqlite3.Error: If a statement fails.
+        """
+        self.cursor.execute(f"DELETE FROM {self.tablename}_phonetic WHERE id = ?;", (id_,))
+        self.cursor.execute(f"SELECT {', '.join(Phonetic.FIELDS)} FROM {self.tablename} WHERE id = ?;", (id_,))
+        row = self.cursor.fetchone()
+        if row is not None:
+            self._insert_phonetic_rows(self._phonetic_rows(id_, dict(zip(Phonetic.FIELDS, row))))
+
+    @staticmethod
+    def _phonetic_rows(id_: int, fields: dict) -> list[tuple]:
+        """
+        Compute the rows of an address in the phonetic table.
+
+        :param int id_: The ID of the address.
+        :param dict fields: The field values of the address, at least the Phonetic.FIELDS.
+        :return: The (encoder, code, id) rows.
+        :rtype: list[tuple]
+        """
+        return [(encoder, code, id_) for encoder, code in Phonetic.codes(*(fields[field] for field in Phonetic.FIELDS))]
+
+    def _insert_phonetic_rows(self, rows: list[tuple]):
+        """
+        Insert rows into the phonetic table with one executemany, in primary key order for locality. Rows already
+        stored are skipped, so the codes of an address whose duplicate was replaced or merged can be inserted again.
 
+        :param list[tuple] rows: The (encoder, code, id) rows, see _phonetic_rows.
+        :raise sqlite3.Error: If the statement fails.
+        """
+        if rows:
+            rows.sort()
+            self.cursor.executemany(f"INSERT OR IGNORE INTO {self.tablename}_phonetic (encoder, code, id) "
+                                    f"VALUES (?, ?, ?);", rows)
+
+    @_pooled
     def delete(self, id_: int) -> Optional[int]:
         """
         Deletes an address by its ID.
@@ -124,12 +494,13 @@ class AddressDatabaseSQL(AddressContainerInterface):
             if self.cursor.rowcount == 0:
                 print("No record found with the specified ID.")
                 return None
-            self.conn.commit()
+            self._commit()
             return id_
         except sqlite3.Error as e:
             print(f"Error Code {e.sqlite_errorcode}: {e.sqlite_errorname}")
             return None
 
+    @_pooled
     def update(self, id_: int, **kwargs) -> int:
         """
         Update fields of an address by its ID and keyword arguments. Raises KeyError if the ID is not found.
@@ -144,45 +515,206 @@ class AddressDatabaseSQL(AddressContainerInterface):
         values = list(kwargs.values()) + [id_]
         try:
             self.cursor.execute(f"UPDATE {self.tablename} SET {fields} WHERE id = ?", values)
-            self.conn.commit()
+            if self.cursor.rowcount:
+                if any(field in kwargs for field in Trigram.FIELDS):
+                    self._index_trigrams(id_)
+                if any(field in kwargs for field in Phonetic.FIELDS):
+                    self._index_phonetic(id_)
+            self._commit()
             return id_
         except sqlite3.Error as e:
             raise KeyError(f"Error updating record with ID {id_}: {e}")
 
-    def add_address(self, address: Address) -> int:
+    @_pooled
+    def add_address(self, address: Address, on_conflict: Optional[str] = None) -> int:
         """
-        Add a new address to the address book, ensuring no duplicates are added.
+        Add a new address to the address book. Duplicates (same firstname, lastname and email, where no email and
+        an empty email are the same) are detected by the unique index within the INSERT itself.
 
         :param Address address: The address to add.
-        :return: The ID of the newly added address, 0 if an error occurs or -1 if it already exists.
+        :param str | None on_conflict: How to handle a duplicate, one of the CONFLICT_POLICIES. Defaults to the
+                                       policy given to the constructor.
+        :return: The ID of the newly added address, 0 if an error occurs or -1 if it already exists and is ignored.
+                 If it is replaced or merged, the ID of the stored address.
         :rtype: int
+        :raise ValueError: If on_conflict is unknown.
         """
-        #if self.is_duplicate(address):
-        #    print("This address book entry already exists.")
-        #    return -1
-
+        on_conflict = self._conflict_policy(on_conflict)
         try:
-            self.cursor.execute(f'''
-                        INSERT INTO {self.tablename} (firstname, lastname, street, 
-                        number, postal_code, place, birthdate, phone, email)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', (
-                address.firstname,
-                address.lastname,
-                address.street,
-                address.number,
-                address.postal_code,
-                address.place,
-                address.birthdate,
-                address.phone,
-                address.email
-            )
-                                )
-            self.conn.commit()
-            return self.cursor.lastrowid
+            trigram_rows, phonetic_rows = [], []
+            new_id = self._add(self._address_values(address), on_conflict, trigram_rows, phonetic_rows)
+            self._insert_trigram_rows(trigram_rows)
+            self._insert_phonetic_rows(phonetic_rows)
+            self._commit()
+            return new_id
         except sqlite3.Error:
             print(f"Error adding address: {address}")
             return 0
 
+    @_pooled
+    def add_addresses(self, addresses: Iterable[Address | dict], on_conflict: Optional[str] = None) -> list[int]:
+        """
+        Add several addresses inside one transaction, so the whole batch costs one commit.
+        Items that are already stored or occur twice within the batch are handled like in add_address.
+
+        :param Iterable[Address | dict] addresses: The Address instances or dictionaries with address fields to add.
+        :param str | None on_conflict: How to handle duplicates, see add_address.
+        :return: For every item the ID add_address would return, or 0 if it was rejected or an error occurs.
+        :rtype: list[int]
+        :raise ValueError: If on_conflict is unknown.
+        """
+        on_conflict = self._conflict_policy(on_conflict)
+        addresses = [self._coerce_address(address) for address in addresses]
+        if not any(addresses):
+            return [0] * len(addresses)
+        try:
+            with self.transaction():
+                trigram_rows, phonetic_rows = [], []
+                ids = [0 if address is None
+                       else self._add(self._address_values(address), on_conflict, trigram_rows, phonetic_rows)
+                       for address in addresses]
+                self._insert_trigram_rows(trigram_rows)
+                self._insert_phonetic_rows(phonetic_rows)
+                return ids
+        except sqlite3.Error as e:
+            print(f"Error Code {e.sqlite_errorcode}: {e.sqlite_errorname}")
+            return [0] * len(addresses)
+
+    def _add(self, values: tuple, on_conflict: str, trigram_rows: list, phonetic_rows: list) -> int:
+        """
+        Insert the values of an address with INSERT ... ON CONFLICT on the unique index. Without the unique index
+        (when the table already held duplicates) the duplicate is looked up first. The trigram rows of a new address
+        are computed from the values and appended to trigram_rows, for the caller to insert in one batch with
+        _insert_trigram_rows. A replaced or merged row is reindexed from the table, as are all rows added with
+        replace or merge on the unique index, where an inserted row can't be told from an updated one. A conflict
+        never changes the names, so the phonetic rows are always computed from the values and collected in
+        phonetic_rows.
+
+        :param tuple values: The field values in column order, see _address_values.
+        :param str on_conflict: One of the CONFLICT_POLICIES.
+        :param list trigram_rows: The list collecting the trigram rows of new addresses.
+        :param list phonetic_rows: The list collecting the phonetic rows of added, replaced or merged addresses.
+        :return: The new ID, the ID of the replaced or merged address, or -1 if the address was ignored.
+        :rtype: int
+        :raise sqlite3.Error: If the statement fails.
+        """
+        if self.unique_index:
+            self.cursor.execute(self._upsert_query(on_conflict), values)
+            rows = self.cursor.fetchall()
+            new_id = rows[0][0] if rows else -1
+            inserted = on_conflict == "ignore" and new_id > 0
+        else:
+            self.cursor.execute(f"SELECT id FROM {self.tablename} WHERE firstname = ? AND lastname = ? "
+                                f"AND ifnull(email, '') = ifnull(?, '') LIMIT 1;", (values[0], values[1], values[-1]))
+            row = self.cursor.fetchone()
+            inserted = row is None
+            if row is None:
+                self.cursor.execute(self._insert_query(), values)
+                new_id = self.cursor.lastrowid
+            elif on_conflict == "ignore":
+                new_id = -1
+            else:
+                assignments = ", ".join(self._conflict_assignments(on_conflict, "?"))
+                params = [value for column, value in zip(self.COLUMNS, values) if column in self._UPDATE_COLUMNS]
+                self.cursor.execute(f"UPDATE {self.tablename} SET {assignments} WHERE id = ?;", [*params, row[0]])
+                new_id = row[0]
+        fields = dict(zip(self.COLUMNS, values))
+        if inserted:
+            trigram_rows.extend(self._trigram_rows(new_id, fields))
+        elif new_id > 0:
+            self._index_trigrams(new_id)
+        if new_id > 0:
+            phonetic_rows.extend(self._phonetic_rows(new_id, fields))
+        return new_id
+
+    def _conflict_policy(self, on_conflict: Optional[str]) -> str:
+        """
+        Check a conflict policy, None standing for the default policy of this address book.
+
+        :param str | None on_conflict: The policy to check.
+        :return: The policy.
+        :rtype: str
+        :raise ValueError: If the policy is unknown.
+        """
+        if on_conflict is None:
+            return self.on_conflict
+        if on_conflict not in self.CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: '{on_conflict}'. "
+                             f"Must be one of {list(self.CONFLICT_POLICIES)}.")
+        return on_conflict
+
+    def _conflict_assignments(self, on_conflict: str, value: str) -> list[str]:
+        """
+        Build the SET assignments with which replace or merge overwrite a stored duplicate.
+
+        :param str on_conflict: Either replace or merge.
+        :param str value: The expression of the new value, with {column} standing for the column name.
+        :return: The assignments of the _UPDATE_COLUMNS.
+        :rtype: list[str]
+        """
+        if on_conflict == "merge":
+            return [f"{column} = coalesce({value.format(column=column)}, {column})" for column in self._UPDATE_COLUMNS]
+        return [f"{column} = {value.format(column=column)}" for column in self._UPDATE_COLUMNS]
+
+    def _upsert_query(self, on_conflict: str) -> str:
+        """
+        Build the INSERT statement that resolves conflicts on the unique index with the given policy and returns the
+        ID of the inserted or updated row.
+
+        :param str on_conflict: One of the CONFLICT_POLICIES.
+        :return: The parametrized INSERT ... ON CONFLICT statement.
+        :rtype: str
+        """
+        if on_conflict == "ignore":
+            action = "DO NOTHING"
+        else:
+            action = "DO UPDATE SET " + ", ".join(self._conflict_assignments(on_conflict, "excluded.{column}"))
+        return (self._insert_query().rstrip(";") +
+                f" ON CONFLICT (firstname, lastname, ifnull(email, '')) {action} RETURNING id;")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group all changes made within the block into one transaction: the commits of add_address, update, delete
+        and save are deferred and done once when the outermost block exits. If the block raises an exception, its
+        changes are rolled back. Nested blocks use savepoints, so a failing inner block only reverts its own changes.
+        In pooled mode the thread keeps its connection for the whole block.
+
+        :return: A context manager yielding this address book.
+        """
+        with self._checkout():
+            level = self._transaction_depth
+            if level == 0:
+                if not self.conn.in_transaction:
+                    # Take the write lock up front, so a pooled connection can't fail to upgrade a read snapshot later.
+                    self.cursor.execute("BEGIN IMMEDIATE;")
+            else:
+                self.cursor.execute(f"SAVEPOINT level_{level};")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if level == 0:
+                    self.conn.rollback()
+                else:
+                    self.cursor.execute(f"ROLLBACK TO level_{level};")
+                    self.cursor.execute(f"RELEASE level_{level};")
+                raise
+            self._transaction_depth -= 1
+            if level == 0:
+                self.conn.commit()
+            else:
+                self.cursor.execute(f"RELEASE level_{level};")
+
+    def _commit(self):
+        """
+        Commit the current transaction, unless a transaction block is active which commits when it ends.
+        """
+        if self._transaction_depth == 0:
+            self.conn.commit()
+
+    @_pooled
     def get_all(self) -> dict[int, Address]:
         """
         Return all address entries as a dictionary.
@@ -192,8 +724,71 @@ class AddressDatabaseSQL(AddressContainerInterface):
         """
         self.cursor.execute(f"SELECT id, firstname, lastname, street, number, postal_code,"
                             f"place, birthdate, phone, email FROM {self.tablename}")
-        return {elements[0]: Address(*elements[1:]) for elements in self.cursor.fetchall()}
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    def iter_addresses(self, batch_size: int = 1000) -> Iterator[tuple[int, Address]]:
+        """
+        Iterate over all addresses, fetching batch_size rows at a time with a dedicated cursor.
 
+        :param int batch_size: The maximum number of rows fetched at once.
+        :return: An iterator of (ID, Address) pairs.
+        :rtype: Iterator[tuple[int, Address]]
+        """
+        return self._iter_query(f"SELECT id, firstname, lastname, street, number, postal_code,"
+                                f"place, birthdate, phone, email FROM {self.tablename};", [], batch_size)
+
+    def iter_search(self, field: str, search_string: str, batch_size: int = 1000,
+                    exact: bool = False) -> Iterator[tuple[int, Address]]:
+        """
+        Streaming variant of search, fetching batch_size matching rows at a time with a dedicated cursor.
+
+        :param str field: The field to search within, or an empty string to search across all fields.
+        :param str search_string: The string to search for.
+        :param int batch_size: The maximum number of rows fetched at once.
+        :param bool exact: Match whole field values instead of substrings, see search.
+        :return: An iterator of (ID, Address) pairs of the matching addresses.
+        :rtype: Iterator[tuple[int, Address]]
+        :raises ValueError: If the specified field is invalid (i.e., not in the allowed columns)
+        """
+        condition, params = self._search_condition(search_string, field, exact)
+        return self._iter_query(self._select(condition) + " ORDER BY id;", params, batch_size)
+
+    def _iter_query(self, query: str, params: list, batch_size: int) -> Iterator[tuple[int, Address]]:
+        """
+        Execute a SELECT of the address columns on its own cursor and yield the rows batch by batch.
+        Using a separate cursor keeps the shared cursor free for other calls while the iterator is consumed.
+        In pooled mode the connection is held until the iterator is exhausted or closed.
+
+        :param str query: The SELECT statement returning the id followed by the address columns.
+        :param list params: The parameters of the query.
+        :param int batch_size: The maximum number of rows fetched at once.
+        :return: An iterator of (ID, Address) pairs.
+        :rtype: Iterator[tuple[int, Address]]
+        """
+        with self._checkout():
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(query, params)
+                while batch := cursor.fetchmany(batch_size):
+                    for elements in batch:
+                        yield elements[0], self._to_address(elements[1:])
+            finally:
+                cursor.close()
+
+    @_pooled
+    def get_page(self, limit: int, after_id: int = 0) -> dict[int, Address]:
+        """
+        Return one page of all addresses, ordered by ID, using WHERE id > ? ORDER BY id LIMIT ? on the primary key.
+
+        :param int limit: The maximum number of addresses on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit addresses with IDs greater than after_id.
+        :rtype: dict[int, Address]
+        """
+        self.cursor.execute(self._select("id > ?") + " ORDER BY id LIMIT ?;", (after_id, limit))
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    @_pooled
     def get(self, id_: int) -> Optional[Address]:
         """
         Retrieve an address by its ID.
@@ -206,26 +801,71 @@ class AddressDatabaseSQL(AddressContainerInterface):
                             f"place, birthdate, phone, email FROM {self.tablename} WHERE id = {id_}")
         result = self.cursor.fetchone()
         if result:
-            return Address(*result[1:])
+            return self._to_address(result[1:])
         return None
 
+    @_pooled
     def get_todays_birthdays(self) -> dict[int, Address]:
         """
         Get all addresses of persons who have their birthday today.
+        Uses the index on the generated birth_month_day column instead of evaluating every birthdate.
 
         :return: A dictionary where keys are IDs and values are Address objects with matching birthdays.
         :rtype: dict[int, Address]:
         """
         self.cursor.execute(f"SELECT id, firstname, lastname, street, number, postal_code,"
-                            f"place, birthdate, phone, email FROM {self.tablename} "
-                            f"WHERE strftime('%m-%d', birthdate) = '{date.today().strftime('%m-%d')}';")
-        return {elements[0]: Address(*elements[1:]) for elements in self.cursor.fetchall()}
+                            f"place, birthdate, phone, email FROM {self.tablename} WHERE birth_month_day = ?;",
+                            (date.today().strftime('%m-%d'),))
+        return {elements[0]: self._to_address(elements[1:]) for elements in self.cursor.fetchall()}
+
+    def _to_address(self, values: tuple) -> Address | AddressRecord:
+        """
+        Convert the address columns of a row into an Address, or an AddressRecord in records mode.
+        In trusted mode the validation is skipped.
+
+        :param tuple values: The column values from firstname to email.
+        :return: The address.
+        :rtype: Address | AddressRecord
+        """
+        if self.trusted:
+            return (AddressRecord if self.records else Address).from_trusted(*values)
+        address = Address(*values)
+        return AddressRecord.from_address(address) if self.records else address
+
+    def _insert_query(self) -> str:
+        """
+        Build the INSERT statement used for new addresses.
+
+        :return: The parametrized INSERT statement.
+        :rtype: str
+        """
+        return (f"INSERT INTO {self.tablename} (firstname, lastname, street, number, postal_code, place, birthdate, "
+                f"phone, email) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);")
+
+    @staticmethod
+    def _address_values(address: Address) -> tuple:
+        """
+        Return the fields of an address in the column order of the INSERT statement.
 
+        :param Address address: The address to convert.
+        :return: The field values of the address.
+        :rtype: tuple
+        """
+        return (address.firstname, address.lastname, address.street, address.number, address.postal_code,
+                address.place, address.birthdate, address.phone, address.email)
+
+    @_pooled
     def setup_table(self):
         """
         Creates a table in the currently specified filepath with all fields given in the Address dataclass and an
         automatically increasing id as the primary key. Doesn't create in case there already is one with the name in the
-        tablename attribute.
+        tablename attribute. Also creates the generated birth_month_day column ('MM-DD' of the birthdate) with its
+        index used by get_todays_birthdays, and the case-insensitive INDEXES used by exact searches. The unique
+        index on firstname, lastname and email lets add_address detect duplicates with ON CONFLICT and answers
+        is_duplicate. If the table already contains duplicates, a non-unique index on the same columns is created
+        instead.
+        Finally sets up the full-text index (see setup_fts), the trigram index (see setup_trigrams) and the phonetic
+        index (see setup_phonetic).
         """
         self.cursor.execute(f'''
             CREATE table IF NOT EXISTS {self.tablename} (
@@ -238,25 +878,136 @@ class AddressDatabaseSQL(AddressContainerInterface):
                 place TEXT,
                 birthdate TEXT,
                 phone TEXT,
-                email TEXT);
+                email TEXT,
+                birth_month_day TEXT GENERATED ALWAYS AS (substr(birthdate, 6, 5)) STORED);
         ''')
         try:
             self.cursor.execute(f'''ALTER TABLE {self.tablename} RENAME COLUMN "birthday" to "birthdate";''')
         except sqlite3.Error as e:
             pass
+        try:
+            # Tables created before the column existed; ALTER TABLE can only add virtual generated columns.
+            self.cursor.execute(f'''ALTER TABLE {self.tablename} ADD COLUMN birth_month_day TEXT
+                                    GENERATED ALWAYS AS (substr(birthdate, 6, 5)) VIRTUAL;''')
+        except sqlite3.Error as e:
+            pass
+        self.cursor.execute(f'''CREATE INDEX IF NOT EXISTS idx_{self.tablename}_birth_month_day
+                                ON {self.tablename} (birth_month_day);''')
+        try:
+            self.cursor.execute(f'''CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.tablename}_unique
+                                    ON {self.tablename} (firstname, lastname, ifnull(email, ''));''')
+            self.unique_index = True
+            # The unique index answers the duplicate lookups, a second index would only slow down the writes.
+            self.cursor.execute(f"DROP INDEX IF EXISTS idx_{self.tablename}_duplicate;")
+        except sqlite3.IntegrityError:
+            print(f"Table {self.tablename} contains duplicates, they are detected without a unique index.")
+            self.unique_index = False
+            self.cursor.execute(f'''CREATE INDEX IF NOT EXISTS idx_{self.tablename}_duplicate
+                                    ON {self.tablename} (firstname, lastname, ifnull(email, ''));''')
+        for name, columns in self.INDEXES.items():
+            columns = ", ".join(f"{column} COLLATE NOCASE" for column in columns)
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.tablename}_{name} "
+                                f"ON {self.tablename} ({columns});")
+        self.setup_fts()
+        self.setup_trigrams()
+        self.setup_phonetic()
         self.conn.commit()
 
+    def setup_fts(self):
+        """
+        Creates the FTS5 table {tablename}_fts as external-content index over the address columns and the triggers
+        keeping it in sync with inserts, updates and deletes. A newly created index is filled from the existing rows.
+        Sets fts_available to False if SQLite was built without FTS5.
+        """
+        fts = f"{self.tablename}_fts"
+        columns = ", ".join(self.COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in self.COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in self.COLUMNS)
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (fts,))
+        exists = self.cursor.fetchone() is not None
+        try:
+            self.cursor.execute(f'''CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+                                    USING fts5({columns}, content='{self.tablename}', content_rowid='id');''')
+        except sqlite3.OperationalError:
+            self.fts_available = False
+            return
+        self.cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {self.tablename} BEGIN
+                                    INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {new_values});
+                                END;''')
+        self.cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {self.tablename} BEGIN
+                                    INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                                END;''')
+        self.cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {self.tablename} BEGIN
+                                    INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                                    INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {new_values});
+                                END;''')
+        if not exists:
+            self.cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild');")
+        self.fts_available = True
+
+    def setup_trigrams(self):
+        """
+        Creates the table {tablename}_trigrams of the trigrams of the Trigram.FIELDS of every address, keyed on
+        field and trigram so fuzzy_search can look up the candidates, and the trigger removing the trigrams of
+        deleted addresses. A newly created table is filled from the existing rows. Computing the trigrams needs
+        Python, so inserts and updates done by other programs are not indexed.
+        """
+        trigrams = f"{self.tablename}_trigrams"
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (trigrams,))
+        exists = self.cursor.fetchone() is not None
+        self.cursor.execute(f'''CREATE TABLE IF NOT EXISTS {trigrams} (
+                                    field TEXT NOT NULL,
+                                    trigram TEXT NOT NULL,
+                                    id INTEGER NOT NULL,
+                                    PRIMARY KEY (field, trigram, id)) WITHOUT ROWID;''')
+        self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{trigrams}_id ON {trigrams} (id);")
+        self.cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS {trigrams}_delete AFTER DELETE ON {self.tablename} BEGIN
+                                    DELETE FROM {trigrams} WHERE id = old.id;
+                                END;''')
+        if not exists:
+            rows = self.conn.execute(f"SELECT id, {', '.join(Trigram.FIELDS)} FROM {self.tablename};")
+            self.cursor.executemany(f"INSERT INTO {trigrams} (field, trigram, id) VALUES (?, ?, ?);",
+                                    ((field, gram, row[0]) for row in rows
+                                     for field, value in zip(Trigram.FIELDS, row[1:])
+                                     for gram in Trigram.trigrams(value)))
+
+    def setup_phonetic(self):
+        """
+        Creates the table {tablename}_phonetic of the phonetic codes of firstname and lastname of every address
+        under every encoder, keyed on encoder and code so search_phonetic is a single lookup, and the trigger
+        removing the codes of deleted addresses. A newly created table is filled from the existing rows. Like the
+        trigrams, the codes of rows inserted or updated by other programs are not indexed.
+        """
+        phonetic = f"{self.tablename}_phonetic"
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (phonetic,))
+        exists = self.cursor.fetchone() is not None
+        self.cursor.execute(f'''CREATE TABLE IF NOT EXISTS {phonetic} (
+                                    encoder TEXT NOT NULL,
+                                    code TEXT NOT NULL,
+                                    id INTEGER NOT NULL,
+                                    PRIMARY KEY (encoder, code, id)) WITHOUT ROWID;''')
+        self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{phonetic}_id ON {phonetic} (id);")
+        self.cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS {phonetic}_delete AFTER DELETE ON {self.tablename} BEGIN
+                                    DELETE FROM {phonetic} WHERE id = old.id;
+                                END;''')
+        if not exists:
+            rows = self.conn.execute(f"SELECT id, {', '.join(Phonetic.FIELDS)} FROM {self.tablename};")
+            self.cursor.executemany(f"INSERT INTO {phonetic} (encoder, code, id) VALUES (?, ?, ?);",
+                                    ((encoder, code, row[0]) for row in rows
+                                     for encoder, code in Phonetic.codes(*row[1:])))
+
+    @_pooled
     def is_duplicate(self, address: Address) -> bool:
         """
-        Check if an address is a duplicate based on first name, last name, and email.
+        Check if an address is a duplicate based on first name, last name, and email, where no email and an empty
+        email are the same, like for add_address.
+        The lookup is answered by the unique index created in setup_table and stops at the first match.
 
         :param Address address: The address to check for duplicates.
         :return: True if a duplicate is found, otherwise False.
         :rtype: bool
         """
-        self.cursor.execute(f"SELECT id, email FROM {self.tablename} WHERE firstname = ? and lastname = ?;",
-                            (address.firstname, address.lastname))
-        result = self.cursor.fetchall()
-        if result and any(item[1] == address.email for item in result):
-            return True
-        return False
\ No newline at end of file
+        self.cursor.execute(f"SELECT 1 FROM {self.tablename} WHERE firstname = ? AND lastname = ? "
+                            f"AND ifnull(email, '') = ifnull(?, '') LIMIT 1;",
+                            (address.firstname, address.lastname, address.email))
+        return self.cursor.fetchone() is not None
\ No newline at end of file
@@ -0,0 +1,93 @@
+from datetime import date
+from typing import NamedTuple, Optional
+from AddressBook.Address import Address
+
+
+class AddressRecord(NamedTuple):
+    """
+    Compact, read-only representation of an entry in the address book.
+
+    Mirrors the fields of :class:`Address`, but is backed by a tuple without a per-instance ``__dict__`` and without
+    validation, so large result sets need a fraction of the memory. Use :meth:`to_address` to get a full Address.
+
+    :ivar firstname: The first name of the person.
+    :type firstname: str
+    :ivar lastname: The last name of the person.
+    :type lastname: str
+    :ivar street: The street where the person lives.
+    :type street: Optional[str]
+    :ivar number: The house number of the person.
+    :type number: Optional(str)
+    :ivar postal_code: The postal code of the person's address.
+    :type postal_code: Optional(int)
+    :ivar place: The city where the person lives.
+    :type place: Optional(str)
+    :ivar birthdate: The birthdate of the person.
+    :type birthdate: Optional(date)
+    :ivar phone: The phone number of the person.
+    :type phone: Optional(str)
+    :ivar email: The email address of the person.
+    :type email: Optional(str)
+    """
+
+    firstname: str
+    lastname: str
+    street: Optional[str] = None
+    number: Optional[str] = None
+    postal_code: Optional[int] = None
+    place: Optional[str] = None
+    birthdate: Optional[date] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+
+    @classmethod
+    def from_address(cls, address: Address) -> 'AddressRecord':
+        """
+        Creates a record holding the values of an address.
+
+        :param Address address: The address to convert.
+        :return: The record.
+        :rtype: AddressRecord
+        """
+        return cls(address.firstname, address.lastname, address.street, address.number, address.postal_code,
+                   address.place, address.birthdate, address.phone, address.email)
+
+    @classmethod
+    def from_trusted(cls, firstname: str, lastname: str, street: Optional[str] = None, number: Optional[str] = None,
+                     postal_code: Optional[int | str] = None, place: Optional[str] = None,
+                     birthdate: Optional[date | str] = None, phone: Optional[str] = None,
+                     email: Optional[str] = None) -> 'AddressRecord':
+        """
+        Creates a record from stored values the address book has written itself, applying the same conversions
+        as :meth:`Address.from_trusted`.
+
+        :return: The record.
+        :rtype: AddressRecord
+        """
+        return cls(firstname, lastname, street, number,
+                   int(postal_code) if postal_code not in (None, '') else None,
+                   place,
+                   date.fromisoformat(birthdate) if isinstance(birthdate, str) and birthdate else birthdate or None,
+                   phone,
+                   email or None)
+
+    def to_address(self) -> Address:
+        """
+        Converts the record into a full, validated Address.
+
+        :return: The address.
+        :rtype: Address
+        """
+        return Address(*self)
+
+    def __str__(self):
+        """
+        Returns a string representation of the address book entry, formatted like :meth:`Address.__str__`.
+
+        :return: A formatted string containing the full details of the address book entry.
+        :rtype: str
+        """
+        return (
+            f"Name: {self.firstname} {self.lastname} {self.birthdate}\n"
+            f"Address: {self.street} {self.number}, {self.postal_code} {self.place}\n"
+            f"Contact: {self.phone} {self.email}\n")
@@ -0,0 +1,375 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, AsyncExitStack
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Iterable, Optional
+from AddressBook.Address import Address
+from AddressBook.AddressContainerInterface import AddressContainerInterface
+from AddressBook.AddressDatabaseSQL import AddressDatabaseSQL
+
+#: The AsyncAddressContainers the current task holds a transaction of.
+_transactions: ContextVar[tuple] = ContextVar("_transactions", default=())
+
+
+class _ReadWriteLock:
+    """
+    asyncio lock admitting any number of readers or a single writer. Waiting writers block new readers, so a steady
+    stream of reads cannot starve the writers.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self):
+        """
+        Hold the lock as one of possibly many readers for the duration of the block.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        """
+        Hold the lock exclusively for the duration of the block.
+        """
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class AsyncAddressContainer:
+    """
+    asyncio facade for an AddressContainerInterface implementation. Every method of the interface is available as
+    coroutine that runs the blocking call in an executor, so the event loop stays responsive during open, save or a
+    large search.
+
+    Writes run one at a time on a dedicated writer thread, reads run concurrently on a bounded pool of reader threads
+    while no write is in progress. An AddressDatabaseSQL with a single connection can only be used from the thread
+    that opened it, so for it all calls run on the writer thread; give it a pool_size to read in parallel. Reads and
+    writes never overlap, so the readers and the writer share the connections of the pool.
+    """
+
+    def __init__(self, container: AddressContainerInterface, max_workers: Optional[int] = None):
+        """
+        Wrap an address container.
+
+        :param AddressContainerInterface container: The address book to wrap.
+        :param int | None max_workers: The number of reader threads. Defaults to the pool_size of a pooled
+                                       AddressDatabaseSQL and to 4 otherwise.
+        """
+        self.container = container
+        pooled = isinstance(container, AddressDatabaseSQL) and container.pool_size > 0
+        self.concurrent_reads = pooled or not isinstance(container, AddressDatabaseSQL)
+        if max_workers is None:
+            max_workers = container.pool_size if pooled else 4
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="address-writer")
+        self._readers = (ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="address-reader")
+                         if self.concurrent_reads else self._writer)
+        self._lock = _ReadWriteLock()
+
+    async def _run(self, executor: ThreadPoolExecutor, function: Callable, *args, **kwargs):
+        """
+        Run a blocking function in an executor and wait for its result.
+
+        :param ThreadPoolExecutor executor: The executor to run the function in.
+        :param Callable function: The blocking function.
+        :return: The result of the function.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(function, *args, **kwargs))
+
+    async def _read(self, function: Callable, *args, **kwargs):
+        """
+        Run a reading method of the container concurrently with other reads. Within a transaction of the current
+        task it runs on the writer thread, so it sees the uncommitted changes.
+
+        :param Callable function: The bound method of the container.
+        :return: The result of the method.
+        """
+        if self in _transactions.get():
+            return await self._run(self._writer, function, *args, **kwargs)
+        async with self._lock.read():
+            return await self._run(self._readers, function, *args, **kwargs)
+
+    async def _write(self, function: Callable, *args, **kwargs):
+        """
+        Run a changing method of the container exclusively on the writer thread.
+
+        :param Callable function: The bound method of the container.
+        :return: The result of the method.
+        """
+        if self in _transactions.get():
+            return await self._run(self._writer, function, *args, **kwargs)
+        async with self._lock.write():
+            return await self._run(self._writer, function, *args, **kwargs)
+
+    async def set_filepath(self, filepath: str):
+        """
+        Set the file path of the wrapped address book.
+
+        :param str filepath: PATH to the file
+        """
+        await self._write(self.container.set_filepath, filepath)
+
+    async def open(self):
+        """
+        Open the wrapped address book.
+        """
+        await self._write(self.container.open)
+
+    async def close(self):
+        """
+        Close the wrapped address book. The executors stay available for opening it again, see shutdown.
+        """
+        await self._write(self.container.close)
+
+    async def save(self):
+        """
+        Save the wrapped address book.
+        """
+        await self._write(self.container.save)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Group the changes made within the block into one transaction of the wrapped address book, see
+        AddressContainerInterface.transaction. The block holds the write lock, so other tasks wait until it ends;
+        calls made by the task itself run on the writer thread without waiting.
+
+        :return: An asynchronous context manager yielding this facade.
+        """
+        async with AsyncExitStack() as stack:
+            if self not in _transactions.get():
+                await stack.enter_async_context(self._lock.write())
+            manager = self.container.transaction()
+            await self._run(self._writer, manager.__enter__)
+            token = _transactions.set(_transactions.get() + (self,))
+            try:
+                yield self
+            except BaseException as e:
+                _transactions.reset(token)
+                if not await self._run(self._writer, manager.__exit__, type(e), e, e.__traceback__):
+                    raise
+            else:
+                _transactions.reset(token)
+                await self._run(self._writer, manager.__exit__, None, None, None)
+
+    async def search(self, field: str, search_string: str) -> dict[int, Address]:
+        """
+        Search for a string in a specific field, see AddressContainerInterface.search.
+
+        :param str field: The field to search within.
+        :param str search_string: The search term to look for.
+        :return: A dictionary where keys are IDs and values are matching addresses.
+        :rtype: dict[int, Address]
+        """
+        # Keywords, as AddressDatabaseSQL.search takes its arguments in the opposite order.
+        return await self._read(self.container.search, field=field, search_string=search_string)
+
+    async def delete(self, id_: int) -> int | None:
+        """
+        Delete an address by its ID.
+
+        :param int id_: The ID of the address to delete.
+        :return: The ID of the deleted address, or None if it was not found.
+        :rtype: int | None
+        """
+        return await self._write(self.container.delete, id_)
+
+    async def update(self, id_: int, **kwargs) -> int:
+        """
+        Update fields of an address by its ID.
+
+        :param int id_: The ID of the address to update.
+        :param kwargs: Field names and their updated values.
+        :return: The ID of the updated address.
+        :rtype: int
+        """
+        return await self._write(self.container.update, id_, **kwargs)
+
+    async def add_address(self, address: Address) -> int:
+        """
+        Add a new address.
+
+        :param Address address: The address to add.
+        :return: The ID of the new address, -1 for a duplicate or 0 if an error occurs.
+        :rtype: int
+        """
+        return await self._write(self.container.add_address, address)
+
+    async def add_addresses(self, addresses: Iterable[Address | dict]) -> list[int]:
+        """
+        Add several addresses at once.
+
+        :param Iterable[Address | dict] addresses: The Address instances or dictionaries with address fields to add.
+        :return: For every item the new ID, -1 if it is a duplicate or 0 if it was rejected.
+        :rtype: list[int]
+        """
+        return await self._write(self.container.add_addresses, list(addresses))
+
+    async def get_all(self) -> dict[int, Address]:
+        """
+        Retrieve all addresses. The dictionary is a copy, taken while no write is in progress, so later writes don't
+        change it while the caller uses it.
+
+        :return: A dictionary where keys are IDs and values are addresses.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(lambda: dict(self.container.get_all()))
+
+    async def get_page(self, limit: int, after_id: int = 0) -> dict[int, Address]:
+        """
+        Retrieve one page of all addresses, ordered by ID.
+
+        :param int limit: The maximum number of addresses on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit addresses with IDs greater than after_id.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(self.container.get_page, limit, after_id)
+
+    async def search_page(self, field: str, search_string: str, limit: int, after_id: int = 0) -> dict[int, Address]:
+        """
+        Retrieve one page of the results of search, ordered by ID.
+
+        :param str field: The field to search within.
+        :param str search_string: The search term to look for.
+        :param int limit: The maximum number of addresses on the page.
+        :param int after_id: The last ID of the previous page, or 0 for the first page.
+        :return: A dictionary of at most limit matching addresses with IDs greater than after_id.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(self.container.search_page, field, search_string, limit, after_id)
+
+    async def prefix_search(self, field: str, prefix: str, limit: int = 10) -> dict[int, Address]:
+        """
+        Retrieve the addresses whose field starts with a prefix, see AddressContainerInterface.prefix_search.
+
+        :param str field: The field to search within.
+        :param str prefix: The beginning of the field value.
+        :param int limit: The maximum number of addresses to return.
+        :return: A dictionary of at most limit matching addresses, ordered by the field value.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(self.container.prefix_search, field, prefix, limit)
+
+    async def fuzzy_search(self, field: str, search_string: str, threshold: float = 0.3,
+                           limit: int = 10) -> dict[int, Address]:
+        """
+        Retrieve the addresses whose field is similar to the search string, see
+        AddressContainerInterface.fuzzy_search.
+
+        :param str field: The field to search within.
+        :param str search_string: The search term to look for.
+        :param float threshold: The minimum similarity of a match.
+        :param int limit: The maximum number of addresses to return.
+        :return: A dictionary of at most limit matching addresses, most similar first.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(self.container.fuzzy_search, field, search_string, threshold, limit)
+
+    async def search_phonetic(self, name: str, encoder: str = "cologne") -> dict[int, Address]:
+        """
+        Retrieve the addresses whose firstname or lastname sounds like the name, see
+        AddressContainerInterface.search_phonetic.
+
+        :param str name: The name to search for.
+        :param str encoder: The phonetic encoder.
+        :return: A dictionary of the matching addresses, ordered by ID.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(self.container.search_phonetic, name, encoder)
+
+    async def iter_addresses(self, batch_size: int = 1000) -> AsyncIterator[tuple[int, Address]]:
+        """
+        Iterate over all addresses, fetching them page by page with get_page. No lock or cursor is held between the
+        pages, so the consumer may change the address book while iterating. Unlike the CSV iter_addresses, unsaved
+        changes are included.
+
+        :param int batch_size: The maximum number of addresses fetched at once.
+        :return: An asynchronous iterator of (ID, Address) pairs in ID order.
+        :rtype: AsyncIterator[tuple[int, Address]]
+        """
+        after_id = 0
+        while page := await self.get_page(batch_size, after_id):
+            for id_, address in page.items():
+                yield id_, address
+            after_id = max(page)
+
+    async def iter_search(self, field: str, search_string: str,
+                          batch_size: int = 1000) -> AsyncIterator[tuple[int, Address]]:
+        """
+        Iterate over the results of search, fetching them page by page with search_page like iter_addresses.
+
+        :param str field: The field to search within.
+        :param str search_string: The search term to look for.
+        :param int batch_size: The maximum number of addresses fetched at once.
+        :return: An asynchronous iterator of (ID, Address) pairs of the matching addresses in ID order.
+        :rtype: AsyncIterator[tuple[int, Address]]
+        """
+        after_id = 0
+        while page := await self.search_page(field, search_string, batch_size, after_id):
+            for id_, address in page.items():
+                yield id_, address
+            after_id = max(page)
+
+    async def get(self, id_: int) -> Address | None:
+        """
+        Retrieve an address by its ID.
+
+        :param int id_: The ID of the address.
+        :return: The address, or None if it was not found.
+        :rtype: Address | None
+        """
+        return await self._read(self.container.get, id_)
+
+    async def get_todays_birthdays(self) -> dict[int, Address]:
+        """
+        Retrieve all addresses of persons who have their birthday today.
+
+        :return: A dictionary where keys are IDs and values are addresses.
+        :rtype: dict[int, Address]
+        """
+        return await self._read(self.container.get_todays_birthdays)
+
+    async def is_duplicate(self, address: Address) -> bool:
+        """
+        Check whether an address with the same first name, last name and email is already stored.
+
+        :param Address address: The address to check.
+        :return: True if a duplicate is found, otherwise False.
+        :rtype: bool
+        """
+        return await self._read(self.container.is_duplicate, address)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut down the executors. The facade can't be used afterwards.
+
+        :param bool wait: Wait until running calls have finished.
+        """
+        self._writer.shutdown(wait=wait)
+        if self._readers is not self._writer:
+            self._readers.shutdown(wait=wait)
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from os import path
+from typing import Dict, Iterator, List, Optional
+
+
+class CSVOffsetIndex:
+    """
+    Random access by ID to the rows of a CSV file written by AddressDatabaseCSV. The file is memory-mapped and
+    indexed by the byte range of every record, so reading a row touches only the pages it is stored on.
+
+    Building the index scans the file once without parsing the fields. The index is cached next to the file
+    (``<filepath>.offsets``) and reused as long as the size, modification time and inode of the file are unchanged.
+    """
+
+    def __init__(self, filepath: str, cache: bool = True):
+        """
+        Map the CSV file and load or build its offset index.
+
+        :param str filepath: The path to the CSV file.
+        :param bool cache: Read and write the cached index next to the file.
+        :raises FileNotFoundError: If the CSV file does not exist.
+        """
+        self.filepath = filepath
+        self.fieldnames: List[str] = []
+        self._file = open(filepath, mode='rb')
+        stat = os.fstat(self._file.fileno())
+        # AddressDatabaseCSV replaces the file on every save, so the inode changes even if size and mtime don't.
+        self._key = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'inode': stat.st_ino}
+        # An empty file can't be mapped.
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self._ids, self._starts, self._ends = array('q'), array('q'), array('q')
+        header_end = self._read_header()
+        if not (cache and self._load_cache()):
+            self._scan(header_end)
+            if cache:
+                self._write_cache()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id_: int) -> bool:
+        return self._position(id_) is not None
+
+    def ids(self) -> Iterator[int]:
+        """
+        Iterate over the IDs of the rows in ascending order.
+
+        :return: An iterator of the IDs.
+        :rtype: Iterator[int]
+        """
+        return iter(self._ids)
+
+    def row(self, id_: int) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Read and split the row with the given ID, like csv.DictReader would.
+
+        :param int id_: The ID of the row.
+        :return: The row as dictionary of field names and values, or None if there is no row with the ID.
+        :rtype: Dict[str, Optional[str]] or None
+        """
+        position = self._position(id_)
+        if position is None:
+            return None
+        text = self._mmap[self._starts[position]:self._ends[position]].decode('utf-8')
+        values = next(csv.reader(io.StringIO(text, newline='')))
+        return {name: values[i] if i < len(values) else None for i, name in enumerate(self.fieldnames)}
+
+    def close(self):
+        """
+        Unmap and close the CSV file.
+        """
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def _position(self, id_: int) -> Optional[int]:
+        """
+        Find the position of an ID in the sorted index.
+
+        :param int id_: The ID to find.
+        :return: The position, or None if the ID is not in the index.
+        :rtype: int or None
+        """
+        position = bisect_left(self._ids, id_)
+        if position < len(self._ids) and self._ids[position] == id_:
+            return position
+        return None
+
+    def _records(self, start: int) -> Iterator[tuple[int, int, bytes]]:
+        """
+        Split the mapped file into records, which end at a line break outside of quotes.
+
+        :param int start: The offset to start at.
+        :return: An iterator of the start and end offset and the first line of every record.
+        :rtype: Iterator[tuple[int, int, bytes]]
+        """
+        if not self._mmap:
+            return
+        self._mmap.seek(start)
+        first, quotes = None, 0
+        while line := self._mmap.readline():
+            if first is None:
+                first = line
+            # Quotes inside quoted fields are doubled, so an odd count means the record continues.
+            quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                end = self._mmap.tell()
+                yield start, end, first
+                start, first, quotes = end, None, 0
+
+    def _read_header(self) -> int:
+        """
+        Read the field names from the first record.
+
+        :return: The offset after the header.
+        :rtype: int
+        """
+        for start, end, _ in self._records(0):
+            self.fieldnames = next(csv.reader(io.StringIO(self._mmap[start:end].decode('utf-8'), newline='')))
+            return end
+        return 0
+
+    def _scan(self, start: int):
+        """
+        Build the index by reading the ID in front of every record.
+
+        :param int start: The offset of the first record after the header.
+        """
+        for record_start, record_end, first in self._records(start):
+            if not first.strip():
+                continue
+            try:
+                id_ = int(first[:first.find(b',')])
+            except ValueError:
+                print(f"Error indexing the row at byte {record_start}: no valid ID.")
+                continue
+            self._ids.append(id_)
+            self._starts.append(record_start)
+            self._ends.append(record_end)
+        if any(a >= b for a, b in zip(self._ids, self._ids[1:])):
+            order = sorted(range(len(self._ids)), key=self._ids.__getitem__)
+            self._ids, self._starts, self._ends = (array('q', (column[i] for i in order))
+                                                   for column in (self._ids, self._starts, self._ends))
+
+    def _cache_path(self) -> str:
+        """
+        Return the path of the cached index.
+
+        :return: The path of the cache file.
+        :rtype: str
+        """
+        return self.filepath + '.offsets'
+
+    def _load_cache(self) -> bool:
+        """
+        Load the cached index if it belongs to the current state of the CSV file.
+
+        :return: True if the cache was loaded.
+        :rtype: bool
+        """
+        try:
+            with open(self._cache_path(), mode='rb') as file:
+                header = json.loads(file.readline())
+                if header.get('key') != self._key:
+                    return False
+                for column in (self._ids, self._starts, self._ends):
+                    column.fromfile(file, header['count'])
+            return True
+        except (OSError, ValueError, EOFError, KeyError):
+            self._ids, self._starts, self._ends = array('q'), array('q'), array('q')
+            return False
+
+    def _write_cache(self):
+        """
+        Write the index next to the CSV file. Failing to write it, e.g. in a read-only directory, is not an error.
+        """
+        try:
+            descriptor, temp_path = tempfile.mkstemp(dir=path.dirname(path.abspath(self.filepath)),
+                                                     prefix=path.basename(self._cache_path()) + '.', suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with open(descriptor, mode='wb') as file:
+                file.write(json.dumps({'key': self._key, 'count': len(self._ids)}).encode('utf-8') + b'\n')
+                for column in (self._ids, self._starts, self._ends):
+                    column.tofile(file)
+            os.replace(temp_path, self._cache_path())
+        except OSError:
+            os.remove(temp_path)
@@ -0,0 +1,122 @@
+"""
+Phonetic codes for matching names by how they sound. Names spelled differently but pronounced alike, like "Meyer"
+and "Maier", get the same code. Two encoders are available: Kölner Phonetik, designed for German names, and the
+American Soundex for English ones.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from AddressBook.Trigram import normalize
+
+#: The address fields search_phonetic compares.
+FIELDS = ("firstname", "lastname")
+
+_COLOGNE_CODES = {**dict.fromkeys("AEIJOUY", "0"), "H": "", "B": "1", "P": "1", "D": "2", "T": "2",
+                  **dict.fromkeys("FVW", "3"), **dict.fromkeys("GKQ", "4"), "L": "5", "M": "6", "N": "6", "R": "7",
+                  "S": "8", "Z": "8"}
+
+_SOUNDEX_CODES = {**dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), "D": "3", "T": "3", "L": "4",
+                  "M": "5", "N": "5", "R": "6"}
+
+
+def _letters(name: str) -> str:
+    """
+    Reduce a name to its letters A to Z, with umlauts and ß transliterated (see Trigram.normalize).
+
+    :param str name: The name.
+    :return: The uppercase letters of the name.
+    :rtype: str
+    """
+    return "".join(char for char in normalize(name).upper() if "A" <= char <= "Z")
+
+
+def cologne(name: str) -> str:
+    """
+    Encode a name with the Kölner Phonetik, e.g. "Müller" as "657" and both "Schmidt" and "Schmitt" as "862".
+
+    :param str name: The name to encode.
+    :return: The code, empty if the name contains no letters.
+    :rtype: str
+    """
+    letters = _letters(name)
+    codes = []
+    for i, char in enumerate(letters):
+        before = letters[i - 1] if i else ""
+        after = letters[i + 1] if i + 1 < len(letters) else ""
+        if char == "P" and after == "H":
+            code = "3"
+        elif char in "DT" and after and after in "CSZ":
+            code = "8"
+        elif char == "C":
+            if i == 0:
+                code = "4" if after and after in "AHKLOQRUX" else "8"
+            else:
+                code = "4" if after and after in "AHKOQUX" and before not in "SZ" else "8"
+        elif char == "X":
+            code = "8" if before and before in "CKQ" else "48"
+        else:
+            code = _COLOGNE_CODES[char]
+        if code:
+            codes.append(code)
+    # Repeated codes are written once, then the vowels are dropped except at the start.
+    collapsed = [code for i, code in enumerate(codes) if i == 0 or code != codes[i - 1]]
+    return "".join(code for i, code in enumerate(collapsed) if code != "0" or i == 0)
+
+
+def soundex(name: str) -> str:
+    """
+    Encode a name with the American Soundex, the first letter followed by three digits, e.g. "Robert" as "R163".
+
+    :param str name: The name to encode.
+    :return: The code, empty if the name contains no letters.
+    :rtype: str
+    """
+    letters = _letters(name)
+    if not letters:
+        return ""
+    digits = []
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for char in letters[1:]:
+        code = _SOUNDEX_CODES.get(char, "")
+        if code and code != previous:
+            digits.append(code)
+        # H and W don't separate letters with the same code, vowels do.
+        if char not in "HW":
+            previous = code
+    return (letters[0] + "".join(digits) + "000")[:4]
+
+
+#: The available encoders by name.
+ENCODERS: Dict[str, Callable[[str], str]] = {"cologne": cologne, "soundex": soundex}
+
+
+def encoder(name: str) -> Callable[[str], str]:
+    """
+    Look up an encoder by name.
+
+    :param str name: One of the ENCODERS.
+    :return: The encoding function.
+    :rtype: Callable[[str], str]
+    :raises ValueError: If there is no encoder of that name.
+    """
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown encoder: '{name}'. Must be one of {list(ENCODERS)}.")
+    return ENCODERS[name]
+
+
+def codes(*names: Optional[str]) -> Set[Tuple[str, str]]:
+    """
+    Return the codes of names under all encoders, as they are stored in the phonetic indexes. Names repeat a lot
+    in an address book, so the codes of recent names are cached.
+
+    :param str | None names: The names to encode, None for empty fields.
+    :return: The (encoder name, code) pairs, without empty codes.
+    :rtype: Set[Tuple[str, str]]
+    """
+    return {key for name in names if name for key in _codes(str(name))}
+
+
+@lru_cache(maxsize=4096)
+def _codes(name: str) -> FrozenSet[Tuple[str, str]]:
+    return frozenset((encoder_name, code) for encoder_name, function in ENCODERS.items()
+                     for code in (function(name),) if code)
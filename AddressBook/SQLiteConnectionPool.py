@@ -0,0 +1,170 @@
+import queue
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class _Lease:
+    """
+    The connection and cursor a thread holds. When the lease is dropped, either by release or because its thread
+    ended, the connection goes back to the pool.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, cursor: sqlite3.Cursor):
+        self.connection = connection
+        self.cursor = cursor
+        self.give_back = None
+
+
+class SQLiteConnectionPool:
+    """
+    Pool of connections to one SQLite database file. A thread checks a connection out for the duration of an
+    operation (see checkout) and gives it back afterwards, so any number of threads can share size connections; they
+    read in parallel (with WAL) while SQLite serializes the writers. A thread asking for a connection while all are
+    checked out waits up to timeout seconds.
+
+    connection and cursor called outside of a checkout lease a connection to the thread until it calls release or
+    ends.
+    """
+
+    def __init__(self, filepath: str, size: int, pragmas: dict | None = None, timeout: float = 5.0):
+        """
+        Initialize the pool. Connections are opened lazily on first use.
+
+        :param str filepath: The path to the SQLite database file.
+        :param int size: The maximum number of open connections.
+        :param dict | None pragmas: PRAGMA names and values applied to every new connection.
+        :param float timeout: Seconds to wait for a free connection, also used as busy timeout of the connections.
+        :raise ValueError: If size is smaller than 1.
+        """
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}. Must be at least 1.")
+        self.filepath = filepath
+        self.size = size
+        self.pragmas = dict(pragmas or {})
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return the connection of the calling thread, leasing one from the pool on first use.
+
+        :return: The connection of the calling thread.
+        :rtype: sqlite3.Connection
+        :raise TimeoutError: If no connection became free within timeout seconds.
+        """
+        return self._lease().connection
+
+    def cursor(self) -> sqlite3.Cursor:
+        """
+        Return the cursor belonging to the connection of the calling thread.
+
+        :return: The cursor of the calling thread.
+        :rtype: sqlite3.Cursor
+        :raise TimeoutError: If no connection became free within timeout seconds.
+        """
+        return self._lease().cursor
+
+    @contextmanager
+    def checkout(self) -> Iterator[sqlite3.Connection]:
+        """
+        Hold a connection for the calling thread for the duration of the block and give it back at the end.
+        Within the block connection and cursor return it. Nested blocks, and blocks of a thread that already holds
+        a lease, use the connection the thread already has and leave it to the outer holder.
+
+        :return: A context manager yielding the connection.
+        :raise TimeoutError: If no connection became free within timeout seconds.
+        """
+        if getattr(self._local, "lease", None) is not None:
+            yield self._local.lease.connection
+            return
+        lease = self._lease()
+        try:
+            yield lease.connection
+        finally:
+            # A suspended generator holding a checkout may be closed from another thread.
+            if getattr(self._local, "lease", None) is lease:
+                del self._local.lease
+            lease.give_back()
+
+    def release(self):
+        """
+        Give the connection of the calling thread back to the pool. An open transaction is rolled back.
+        """
+        lease = self._local.__dict__.pop("lease", None)
+        if lease is not None:
+            lease.give_back()
+
+    def close(self):
+        """
+        Close all connections opened by the pool, including those still leased by other threads.
+        """
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+        self._idle = queue.LifoQueue()
+
+    def _lease(self) -> _Lease:
+        """
+        Return the lease of the calling thread, acquiring a connection if the thread has none.
+
+        :return: The lease of the calling thread.
+        :rtype: _Lease
+        """
+        lease = getattr(self._local, "lease", None)
+        if lease is None:
+            lease = _Lease(*self._acquire())
+            # Called by release, or when the lease is dropped with its thread; it runs only once.
+            lease.give_back = weakref.finalize(lease, self._give_back, self._idle, lease.connection, lease.cursor)
+            self._local.lease = lease
+        return lease
+
+    def _acquire(self) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
+        """
+        Take an idle connection, open a new one if the pool is not full yet or wait for one to be released.
+
+        :return: The connection and its cursor.
+        :rtype: tuple[sqlite3.Connection, sqlite3.Cursor]
+        :raise TimeoutError: If no connection became free within timeout seconds.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                # Connections move between threads when they are released, sqlite3 serializes access itself.
+                connection = sqlite3.connect(self.filepath, timeout=self.timeout, check_same_thread=False)
+                cursor = connection.cursor()
+                for pragma, value in self.pragmas.items():
+                    cursor.execute(f"PRAGMA {pragma} = {value};")
+                self._connections.append(connection)
+                return connection, cursor
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free connection in the pool of {self.size} after {self.timeout} seconds.")
+
+    @staticmethod
+    def _give_back(idle: queue.LifoQueue, connection: sqlite3.Connection, cursor: sqlite3.Cursor):
+        """
+        Return a connection to the idle queue, rolling back a transaction its last thread left open.
+
+        :param queue.LifoQueue idle: The idle queue of the pool the connection belongs to.
+        :param sqlite3.Connection connection: The connection to return.
+        :param sqlite3.Cursor cursor: The cursor of the connection.
+        """
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.ProgrammingError:
+            # The pool was closed while the connection was leased.
+            return
+        idle.put((connection, cursor))
@@ -0,0 +1,142 @@
+"""
+Trigram similarity for typo-tolerant search. Texts are normalized (casefolded, German umlauts transliterated,
+other diacritics removed) and split into the trigrams of their words, each word padded with two spaces in front and
+one behind. Two texts are as similar as the share of trigrams they have in common (Jaccard similarity).
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+#: The address fields fuzzy_search can search.
+FIELDS = ("firstname", "lastname", "street", "place")
+
+_TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize a text for comparison, so e.g. "Müller" and "MUELLER" become the same.
+
+    :param str text: The text to normalize.
+    :return: The casefolded text with umlauts transliterated and other diacritics removed.
+    :rtype: str
+    """
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFC", text.casefold()).translate(_TRANSLITERATION)
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def trigrams(text: Optional[str]) -> FrozenSet[str]:
+    """
+    Return the trigrams of the words of a text. Names and places repeat a lot in an address book, so the trigrams of
+    recent texts are cached.
+
+    :param str | None text: The text, None for an empty field.
+    :return: The set of trigrams, empty if the text contains no words.
+    :rtype: FrozenSet[str]
+    """
+    if not text:
+        return frozenset()
+    return _trigrams(str(text))
+
+
+@lru_cache(maxsize=4096)
+def _trigrams(text: str) -> FrozenSet[str]:
+    return frozenset(padded[i:i + 3] for word in re.findall(r"\w+", normalize(text))
+                     for padded in (f"  {word} ",) for i in range(len(padded) - 2))
+
+
+def similarity(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    """
+    Return the Jaccard similarity of two trigram sets.
+
+    :param FrozenSet[str] first: The trigrams of the first text.
+    :param FrozenSet[str] second: The trigrams of the second text.
+    :return: The similarity from 0 (nothing in common) to 1 (same trigrams).
+    :rtype: float
+    """
+    if not first or not second:
+        return 0.0
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def minimum_shared(query: FrozenSet[str], threshold: float) -> int:
+    """
+    Return how many trigrams a text must share with the query to possibly reach the threshold. As the union of two
+    trigram sets is at least as large as the query, a similarity of threshold needs threshold * len(query) shared
+    trigrams, which lets the candidates be filtered before their similarity is computed.
+
+    :param FrozenSet[str] query: The trigrams of the query.
+    :param float threshold: The minimum similarity.
+    :return: The minimum number of shared trigrams, at least 1.
+    :rtype: int
+    """
+    return max(1, math.ceil(threshold * len(query) - 1e-9))
+
+
+class TrigramIndex:
+    """
+    In-memory inverted index from trigrams to the IDs of the texts containing them.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[int, FrozenSet[str]] = {}
+
+    def add(self, id_: int, text: Optional[str]):
+        """
+        Index the text of an ID. An ID can only have one text, remove it before adding a new one.
+
+        :param int id_: The ID.
+        :param str | None text: The text, None for an empty field.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return
+        self._trigrams[id_] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(id_)
+
+    def remove(self, id_: int):
+        """
+        Remove the text of an ID from the index.
+
+        :param int id_: The ID.
+        """
+        for gram in self._trigrams.pop(id_, ()):
+            ids = self._postings[gram]
+            ids.discard(id_)
+            if not ids:
+                del self._postings[gram]
+
+    def search(self, text: str, threshold: float, limit: int) -> List[Tuple[int, float]]:
+        """
+        Find the IDs of the texts most similar to a text. Candidates are collected from the postings of the trigrams
+        of the text, so texts without a trigram in common are never looked at.
+
+        :param str text: The text to search for.
+        :param float threshold: The minimum similarity of a result.
+        :param int limit: The maximum number of results.
+        :return: The (ID, similarity) pairs, most similar first and IDs ascending among equally similar texts.
+        :rtype: List[Tuple[int, float]]
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+        shared = Counter()
+        for gram in query:
+            shared.update(self._postings.get(gram, ()))
+        minimum = minimum_shared(query, threshold)
+        results = []
+        for id_, count in shared.items():
+            if count >= minimum:
+                score = count / (len(query) + len(self._trigrams[id_]) - count)
+                if score >= threshold:
+                    results.append((id_, score))
+        results.sort(key=lambda result: (-result[1], result[0]))
+        return results[:limit]
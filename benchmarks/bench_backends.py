@@ -0,0 +1,175 @@
+"""
+Measures the main operations of the CSV and SQLite backends on deterministic synthetic address books and writes
+the time and peak memory of every operation as JSON, so results of different releases can be compared.
+
+Usage: python -m benchmarks.bench_backends [--sizes N [N ...]] [--ops K] [--seed S] [--output FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, Iterator
+
+from AddressBook.Address import Address
+from AddressBook.AddressContainerInterface import AddressContainerInterface
+from AddressBook.AddressDatabaseCSV import AddressDatabaseCSV
+from AddressBook.AddressDatabaseSQL import AddressDatabaseSQL
+
+BACKENDS = {
+    "csv": (AddressDatabaseCSV, "book.csv"),
+    "sqlite": (AddressDatabaseSQL, "book.db"),
+}
+
+
+def generate_addresses(rows: int, start: int = 0) -> Iterator[Address]:
+    """
+    Generate a deterministic sequence of distinct addresses, the same for every run.
+
+    :param int rows: The number of addresses to generate.
+    :param int start: The number of the first address, to generate addresses not contained in a book of start rows.
+    :return: An iterator of the addresses.
+    :rtype: Iterator[Address]
+    """
+    for i in range(start, start + rows):
+        yield Address(firstname=f"First{i}", lastname=f"Last{i % 1000}", street="Musterstraße", number=str(i % 200),
+                      postal_code=28000 + i % 1000, place="Bremen",
+                      birthdate=date(1950 + i % 50, i % 12 + 1, i % 28 + 1), phone=f"0421{i:07d}",
+                      email=f"user{i}@example.com")
+
+
+def create_book(backend: str, filepath: str, rows: int, chunk_size: int = 10_000):
+    """
+    Write a synthetic address book of the given size, adding the addresses in chunks to bound the memory use.
+
+    :param str backend: A key of BACKENDS.
+    :param str filepath: The file to write.
+    :param int rows: The number of addresses.
+    :param int chunk_size: The number of addresses added at once.
+    """
+    db = BACKENDS[backend][0]()
+    db.set_filepath(filepath)
+    db.open()
+    addresses = generate_addresses(rows)
+    while chunk := list(islice(addresses, chunk_size)):
+        db.add_addresses(chunk)
+    db.close()
+
+
+def search(db: AddressContainerInterface, lastname: str) -> dict:
+    """
+    Search the lastname exactly and case-insensitively, which both backends can answer from an index.
+
+    :param AddressContainerInterface db: The address book.
+    :param str lastname: The last name to search for.
+    :return: The matching addresses.
+    :rtype: dict
+    """
+    if isinstance(db, AddressDatabaseSQL):
+        return db.search(lastname, "lastname", exact=True)
+    return db.search("lastname", lastname)
+
+
+def measure(operation: Callable[[], object]) -> tuple[float, int]:
+    """
+    Run an operation once while tracing the memory allocations.
+
+    :param Callable operation: The operation to run.
+    :return: The duration in seconds and the peak of the traced memory in bytes.
+    :rtype: tuple[float, int]
+    """
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    operation()
+    seconds = time.perf_counter() - start
+    return seconds, tracemalloc.get_traced_memory()[1] - baseline
+
+
+def run_backend(backend: str, directory: str, rows: int, ops: int, seed: int) -> list[dict]:
+    """
+    Measure all operations on one backend and book size. Every operation except open and save is repeated ops
+    times with deterministic, seeded arguments.
+
+    :param str backend: A key of BACKENDS.
+    :param str directory: The directory for the book files.
+    :param int rows: The size of the book.
+    :param int ops: The number of repetitions of the repeated operations.
+    :param int seed: The seed of the random arguments.
+    :return: One result per operation.
+    :rtype: list[dict]
+    """
+    filepath = os.path.join(directory, f"{rows}-{BACKENDS[backend][1]}")
+    create_book(backend, filepath, rows)
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, rows + 1), min(ops, rows))
+    new_addresses = list(generate_addresses(ops, start=rows))
+    lastnames = [f"Last{rng.randrange(1000)}" for _ in range(ops)]
+
+    db = BACKENDS[backend][0]()
+    db.set_filepath(filepath)
+    operations = [
+        ("open", 1, db.open),
+        ("add_address", ops, lambda: [db.add_address(address) for address in new_addresses]),
+        ("search", ops, lambda: [search(db, lastname) for lastname in lastnames]),
+        ("get", len(ids), lambda: [db.get(id_) for id_ in ids]),
+        ("update", len(ids), lambda: [db.update(id_, phone="0421000000") for id_ in ids]),
+        ("delete", len(ids), lambda: [db.delete(id_) for id_ in ids]),
+        ("get_todays_birthdays", ops, lambda: [db.get_todays_birthdays() for _ in range(ops)]),
+        ("save", 1, db.save),
+    ]
+    results = []
+    for name, count, operation in operations:
+        seconds, peak_bytes = measure(operation)
+        results.append({"backend": backend, "rows": rows, "operation": name, "count": count, "seconds": seconds,
+                        "seconds_per_op": seconds / count, "peak_bytes": peak_bytes})
+    db.close()
+    results.append({"backend": backend, "rows": rows, "operation": "file_size", "bytes": os.path.getsize(filepath)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="book sizes to measure, e.g. 1000 10000 100000 1000000")
+    parser.add_argument("--ops", type=int, default=100, help="repetitions of the repeated operations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "sizes": args.sizes,
+        "ops": args.ops,
+        "seed": args.seed,
+        "results": [],
+    }
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            for backend in args.backends:
+                results = run_backend(backend, directory, rows, args.ops, args.seed)
+                report["results"].extend(results)
+                for result in results:
+                    if "seconds" in result:
+                        print(f"{backend:6} {rows:>9} {result['operation']:22} "
+                              f"{result['seconds_per_op'] * 1e6:12.1f} us/op  {result['peak_bytes'] / 2**20:9.2f} MiB")
+    tracemalloc.stop()
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares loading a CSV address book with different numbers of worker processes.
+
+Usage: python -m benchmarks.bench_parallel_load [--rows N] [--repeat R] [--workers W [W ...]]
+"""
+import argparse
+import os
+import tempfile
+
+from AddressBook.AddressDatabaseCSV import AddressDatabaseCSV
+from benchmarks.bench_trusted_load import best_of, make_addresses
+
+
+def load(filepath: str, workers: int):
+    """
+    Load a CSV address book completely.
+
+    :param str filepath: The CSV file to load.
+    :param int workers: The number of worker processes.
+    """
+    db = AddressDatabaseCSV(workers=workers)
+    db.set_filepath(filepath)
+    db.open()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "bench.csv")
+        db = AddressDatabaseCSV()
+        db.set_filepath(filepath)
+        db.add_addresses(make_addresses(args.rows))
+        db.save()
+
+        print(f"{args.rows} rows, {os.path.getsize(filepath) / 2**20:.1f} MiB, best of {args.repeat}, "
+              f"{os.cpu_count()} CPUs")
+        serial = None
+        for workers in args.workers:
+            seconds = best_of(args.repeat, lambda: load(filepath, workers))
+            serial = serial or seconds
+            print(f"{workers:2} workers {seconds:8.3f}s  speedup {serial / seconds:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares the throughput of the SQLite performance profiles of AddressDatabaseSQL.
+
+Usage: python -m benchmarks.bench_sqlite_profiles [--rows N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from AddressBook.AddressDatabaseSQL import AddressDatabaseSQL
+from benchmarks.bench_trusted_load import make_addresses
+
+
+def run_profile(directory: str, profile: str | None, addresses: list) -> dict[str, float]:
+    """
+    Measure single inserts, a bulk insert and a full read with one profile.
+
+    :param str directory: The directory for the database files.
+    :param str | None profile: The profile name, or None for the SQLite defaults.
+    :param list addresses: The addresses to insert.
+    :return: Operations per second for every measured operation.
+    :rtype: dict[str, float]
+    """
+    db = AddressDatabaseSQL(profile=profile)
+    db.set_filepath(os.path.join(directory, f"{profile or 'default'}.db"))
+    db.open()
+    result = {}
+
+    single = addresses[:max(1, len(addresses) // 10)]
+    start = time.perf_counter()
+    for address in single:
+        db.add_address(address)
+    result["add_address"] = len(single) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    db.add_addresses(addresses[len(single):])
+    result["add_addresses"] = (len(addresses) - len(single)) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    db.get_all()
+    result["get_all"] = len(addresses) / (time.perf_counter() - start)
+    db.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    addresses = make_addresses(args.rows)
+    print(f"{args.rows} rows, operations per second")
+    print(f"{'profile':10} {'add_address':>12} {'add_addresses':>14} {'get_all':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in (None, *AddressDatabaseSQL.PROFILES):
+            result = run_profile(directory, profile, addresses)
+            print(f"{profile or 'default':10} {result['add_address']:12.0f} {result['add_addresses']:14.0f} "
+                  f"{result['get_all']:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares loading an address book with and without validation of the rows (trusted mode).
+
+Usage: python -m benchmarks.bench_trusted_load [--rows N] [--repeat R]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from AddressBook.Address import Address
+from AddressBook.AddressDatabaseCSV import AddressDatabaseCSV
+from AddressBook.AddressDatabaseSQL import AddressDatabaseSQL
+
+
+def make_addresses(rows: int) -> list[Address]:
+    """
+    Create a deterministic list of addresses.
+
+    :param int rows: The number of addresses to create.
+    :return: The addresses.
+    :rtype: list[Address]
+    """
+    return [Address(firstname=f"First{i}", lastname=f"Last{i % 1000}", street="Musterstraße", number=str(i % 200),
+                    postal_code=28000 + i % 1000, place="Bremen", birthdate=date(1950 + i % 50, i % 12 + 1, i % 28 + 1),
+                    phone=f"0421{i:07d}", email=f"user{i}@example.com") for i in range(rows)]
+
+
+def best_of(repeat: int, load) -> float:
+    """
+    Run a load function several times and return the fastest run.
+
+    :param int repeat: The number of runs.
+    :param load: A function performing one load.
+    :return: The fastest run in seconds.
+    :rtype: float
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def load_csv(filepath: str, trusted: bool):
+    """
+    Load a CSV address book completely.
+
+    :param str filepath: The CSV file to load.
+    :param bool trusted: Whether to skip the validation of the rows.
+    """
+    db = AddressDatabaseCSV(trusted=trusted)
+    db.set_filepath(filepath)
+    db.open()
+
+
+def load_sql(filepath: str, trusted: bool):
+    """
+    Read all addresses of an SQLite address book.
+
+    :param str filepath: The database file to read.
+    :param bool trusted: Whether to skip the validation of the rows.
+    """
+    db = AddressDatabaseSQL(trusted=trusted)
+    db.set_filepath(filepath)
+    db.open()
+    db.get_all()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    addresses = make_addresses(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "bench.csv")
+        csv_db = AddressDatabaseCSV()
+        csv_db.set_filepath(csv_path)
+        csv_db.add_addresses(addresses)
+        csv_db.save()
+
+        sql_path = os.path.join(directory, "bench.db")
+        sql_db = AddressDatabaseSQL()
+        sql_db.set_filepath(sql_path)
+        sql_db.open()
+        sql_db.add_addresses(addresses)
+        sql_db.close()
+
+        print(f"{args.rows} rows, best of {args.repeat}")
+        for name, load, filepath in (("CSV open", load_csv, csv_path), ("SQL get_all", load_sql, sql_path)):
+            validated = best_of(args.repeat, lambda: load(filepath, False))
+            trusted = best_of(args.repeat, lambda: load(filepath, True))
+            print(f"{name:12} validated {validated:8.3f}s  trusted {trusted:8.3f}s  "
+                  f"speedup {validated / trusted:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
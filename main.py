@@ -92,10 +92,15 @@ def delete_address(address_db):
         print(f"No address found with ID {address_id}.")
 
 
-def show_all_addresses(address_db):
+def show_all_addresses(address_db, page_size=20):
     print("All Addresses:")
-    for id_, address in address_db.get_all().items():
-        print(address)
+    page = address_db.get_page(page_size)
+    while page:
+        for id_, address in page.items():
+            print(address)
+        if len(page) < page_size or input("Press Enter for more, or 'q' to stop: ").strip().lower() == 'q':
+            break
+        page = address_db.get_page(page_size, after_id=max(page))
 
 
 def show_a_address(address_db):
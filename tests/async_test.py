@@ -0,0 +1,115 @@
+import asyncio
+import os
+import threading
+import unittest
+from AddressBook.Address import Address
+from AddressBook.AddressDatabaseCSV import AddressDatabaseCSV
+from AddressBook.AddressDatabaseSQL import AddressDatabaseSQL
+from AddressBook.AsyncAddressContainer import AsyncAddressContainer
+
+
+class TestAsyncAddressContainer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self.db.shutdown()
+        for filepath in ('test_async.csv', 'test_async.csv.offsets', 'test_async.db', 'test_async.db-wal',
+                         'test_async.db-shm'):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+    async def open(self, container, filepath):
+        self.db = AsyncAddressContainer(container)
+        await self.db.set_filepath(filepath)
+        await self.db.open()
+
+    async def test_csv(self):
+        await self.open(AddressDatabaseCSV(), 'test_async.csv')
+        self.assertTrue(self.db.concurrent_reads)
+        self.assertEqual(await self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe'},
+                                                     {'firstname': 'Jane', 'lastname': 'Doe'}]), [1, 2])
+        results = await asyncio.gather(*(self.db.search('lastname', 'doe') for _ in range(5)))
+        self.assertEqual([list(result) for result in results], [[1, 2]] * 5)
+        self.assertEqual([id_ async for id_, _ in self.db.iter_addresses(batch_size=1)], [1, 2])
+        self.assertEqual([id_ async for id_, _ in self.db.iter_search('firstname', 'jane')], [2])
+
+    async def test_transaction(self):
+        await self.open(AddressDatabaseCSV(), 'test_async.csv')
+        with self.assertRaises(RuntimeError):
+            async with self.db.transaction():
+                await self.db.add_address(Address(firstname='John', lastname='Doe'))
+                self.assertEqual(len(await self.db.get_all()), 1)
+                raise RuntimeError
+        self.assertEqual(await self.db.get_all(), {})
+
+        async with self.db.transaction():
+            await self.db.add_address(Address(firstname='John', lastname='Doe'))
+        self.assertEqual(list(await self.db.get_all()), [2])
+
+    async def test_sqlite_single_connection(self):
+        await self.open(AddressDatabaseSQL(), 'test_async.db')
+        self.assertFalse(self.db.concurrent_reads)
+        self.assertEqual(await self.db.add_address(Address(firstname='John', lastname='Doe')), 1)
+        async with self.db.transaction():
+            await self.db.update(1, lastname='Smith')
+            self.assertEqual((await self.db.get(1)).lastname, 'Smith')
+        self.assertEqual(list(await self.db.search('lastname', 'smith')), [1])
+
+    async def test_sqlite_pool_reads_concurrently(self):
+        await self.open(AddressDatabaseSQL(pool_size=3), 'test_async.db')
+        await self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe'} for i in range(10)])
+        barrier = threading.Barrier(2, timeout=5)
+
+        def read():
+            barrier.wait()
+            return len(self.db.container.get_all())
+
+        self.assertEqual(await asyncio.gather(self.db._read(read), self.db._read(read)), [10, 10])
+
+    async def test_sqlite_small_pool(self):
+        for pool_size in (1, 2):
+            container = AddressDatabaseSQL(pool_size=pool_size)
+            container.set_filepath('test_async.db')
+            # Opened before wrapping, so the main thread has used a connection.
+            container.open()
+            container._pool.timeout = 1
+            await self.open(container, 'test_async.db')
+            await self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe'} for i in range(10)])
+            results = await asyncio.gather(*(self.db.get_all() for _ in range(8)))
+            self.assertEqual([len(result) for result in results], [10] * 8)
+            if pool_size == 1:
+                await self.db.close()
+                self.db.shutdown()
+                os.remove('test_async.db')
+
+    async def test_csv_lazy_concurrent_reads(self):
+        container = AddressDatabaseCSV()
+        container.set_filepath('test_async.csv')
+        container.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe'} for i in range(1000)])
+        container.save()
+        await self.open(AddressDatabaseCSV(lazy=True), 'test_async.csv')
+        results = await asyncio.gather(*(self.db.search('lastname', 'doe') for _ in range(8)))
+        self.assertEqual([len(result) for result in results], [1000] * 8)
+
+    async def test_get_all_returns_copy(self):
+        await self.open(AddressDatabaseCSV(), 'test_async.csv')
+        await self.db.add_address(Address(firstname='John', lastname='Doe'))
+        addresses = await self.db.get_all()
+        await self.db.add_address(Address(firstname='Jane', lastname='Doe'))
+        self.assertEqual(list(addresses), [1])
+
+    async def test_writes_exclude_reads(self):
+        await self.open(AddressDatabaseCSV(), 'test_async.csv')
+        events = []
+
+        def write():
+            events.append('write start')
+            threading.Event().wait(0.05)
+            events.append('write end')
+
+        await asyncio.gather(self.db._write(write), self.db._read(events.append, 'read'))
+        self.assertEqual(events, ['write start', 'write end', 'read'])
+
+
+if __name__ == '__main__':
+    unittest.main()
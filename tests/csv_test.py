@@ -1,7 +1,13 @@
+import io
+import pickle
 import unittest
 import os
+from contextlib import redirect_stdout
+from unittest import mock
+from datetime import date
 from AddressBook.Address import Address
 from AddressBook.AddressDatabaseCSV import AddressDatabaseCSV
+from AddressBook.AddressRecord import AddressRecord
 
 
 class TestAddressDatabaseCSV(unittest.TestCase):
@@ -14,8 +20,10 @@ class TestAddressDatabaseCSV(unittest.TestCase):
 
     def tearDown(self):
         # Clean up by removing the test file after each test
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        for suffix in ('', '.journal', '.offsets', '.snapshot'):
+            filepath = self.test_file + suffix
+            if os.path.exists(filepath):
+                os.remove(filepath)
 
     def test_open(self):
         # Create a CSV file with test data
@@ -80,6 +88,424 @@ class TestAddressDatabaseCSV(unittest.TestCase):
 
         self.assertEqual(results[2].lastname, 'Smith')  # Access the result by its correct key (2)
 
+    def test_is_duplicate_follows_update_and_delete(self):
+        address = Address(firstname='John', lastname='Doe', street='Muster', number='12a', postal_code=1,
+                          place='bremen', birthdate='2000-01-01', phone='0123456789', email='123@gmail.com')
+        self.db.add_address(address)
+        self.assertEqual(self.db.add_address(Address(firstname='John', lastname='Doe', email='123@gmail.com')), -1)
+
+        self.db.update(1, email='456@gmail.com')
+        self.assertFalse(self.db.is_duplicate(Address(firstname='John', lastname='Doe', email='123@gmail.com')))
+        self.assertTrue(self.db.is_duplicate(Address(firstname='John', lastname='Doe', email='456@gmail.com')))
+
+        self.db.delete(1)
+        self.assertFalse(self.db.is_duplicate(Address(firstname='John', lastname='Doe', email='456@gmail.com')))
+
+    def test_add_address_does_not_reuse_deleted_ids(self):
+        for firstname in ('John', 'Jane', 'Max'):
+            self.db.add_address(Address(firstname=firstname, lastname='Doe'))
+        self.db.delete(3)
+        self.assertEqual(self.db.add_address(Address(firstname='Erika', lastname='Doe')), 4)
+
+        self.db.save()
+        reopened = AddressDatabaseCSV()
+        reopened.set_filepath(self.test_file)
+        reopened.open()
+        self.assertEqual(reopened.add_address(Address(firstname='Otto', lastname='Doe')), 5)
+
+    def test_close_resets_ids(self):
+        for firstname in ('John', 'Jane', 'Max'):
+            self.db.add_address(Address(firstname=firstname, lastname='Doe'))
+        self.db.close()
+        os.remove(self.test_file)
+        self.db.open()
+        self.assertEqual(self.db.add_address(Address(firstname='Erika', lastname='Doe')), 1)
+
+    def test_add_addresses(self):
+        john = Address(firstname='John', lastname='Doe', email='123@gmail.com')
+        result = self.db.add_addresses([john, {'firstname': 'Jane', 'lastname': 'Smith'}, john,
+                                        {'firstname': 'Max', 'postal_code': 'abc'}])
+        self.assertEqual(result, [1, 2, -1, 0])
+        self.assertEqual(self.db.get(2).lastname, 'Smith')
+
+    def test_search_index_follows_changes(self):
+        self.db.add_address(Address(firstname='John', lastname='Doe'))
+        self.assertEqual(list(self.db.search('lastname', 'DOE')), [1])
+
+        self.db.add_address(Address(firstname='Jane', lastname='doe'))
+        self.db.update(1, lastname='Smith')
+        self.assertEqual(list(self.db.search('lastname', 'doe')), [2])
+        self.assertEqual(list(self.db.search('lastname', 'smith')), [1])
+
+        self.db.delete(2)
+        self.assertEqual(self.db.search('lastname', 'doe'), {})
+        with self.assertRaises(ValueError):
+            self.db.search('nickname', 'doe')
+
+    def test_get_todays_birthdays(self):
+        today = date.today()
+        self.db.add_address(Address(firstname='John', lastname='Doe', birthdate=today.replace(year=1990)))
+        self.db.add_address(Address(firstname='Jane', lastname='Doe', birthdate=today.replace(year=1985)))
+        self.db.update(2, birthdate=date(1985, 1, 1) if (today.month, today.day) != (1, 1) else date(1985, 1, 2))
+        self.db.add_address(Address(firstname='Max', lastname='Doe'))
+        self.assertEqual(list(self.db.get_todays_birthdays()), [1])
+
+    def test_indexes_after_reopen(self):
+        today = date.today()
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe', 'email': 'john@example.com'},
+                               {'firstname': 'Jane', 'lastname': 'Doe', 'birthdate': today.replace(year=1985)}])
+        self.db.save()
+        reopened = AddressDatabaseCSV()
+        reopened.set_filepath(self.test_file)
+        reopened.open()
+        self.assertEqual(list(reopened.get_todays_birthdays()), [2])
+        self.assertTrue(reopened.is_duplicate(Address(firstname='John', lastname='Doe', email='john@example.com')))
+        self.assertEqual(reopened.add_address(Address(firstname='Jane', lastname='Doe')), -1)
+        self.assertEqual(reopened.add_address(Address(firstname='Max', lastname='Doe', birthdate=today)), 3)
+        reopened.delete(2)
+        self.assertEqual(list(reopened.get_todays_birthdays()), [3])
+        self.assertFalse(reopened.is_duplicate(Address(firstname='Jane', lastname='Doe')))
+
+    def test_iter_addresses_reads_saved_file(self):
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe'}, {'firstname': 'Jane', 'lastname': 'Smith'}])
+        self.db.save()
+        self.db.add_address(Address(firstname='Max', lastname='Doe'))
+
+        self.assertEqual([(id_, a.firstname) for id_, a in self.db.iter_addresses()], [(1, 'John'), (2, 'Jane')])
+        self.assertEqual([id_ for id_, _ in self.db.iter_search('lastname', 'DOE')], [1])
+        self.assertEqual([id_ for id_, _ in self.db.iter_addresses(batch_size=1)], [1, 2])
+
+    def test_open_trusted(self):
+        address = Address(firstname='John', lastname='Doe', street='Muster', number='12a', postal_code=1,
+                          place='bremen', birthdate='2000-01-01', phone='0123456789', email='123@gmail.com')
+        self.db.add_addresses([address, Address(firstname='Jane', lastname='Doe')])
+        self.db.save()
+
+        trusted = AddressDatabaseCSV(trusted=True)
+        trusted.set_filepath(self.test_file)
+        trusted.open()
+        validated = AddressDatabaseCSV()
+        validated.set_filepath(self.test_file)
+        validated.open()
+        self.assertEqual(trusted.get_all(), validated.get_all())
+        self.assertEqual(trusted.get(1), address)
+
+    def test_records_mode(self):
+        address = Address(firstname='John', lastname='Doe', street='Muster', number='12a', postal_code=1,
+                          place='bremen', birthdate='2000-01-01', phone='0123456789', email='123@gmail.com')
+        self.db.add_address(address)
+        self.db.save()
+
+        db = AddressDatabaseCSV(records=True)
+        db.set_filepath(self.test_file)
+        db.open()
+        record = db.get(1)
+        self.assertIsInstance(record, AddressRecord)
+        self.assertEqual(record.to_address(), address)
+
+        db.update(1, lastname='Smith')
+        self.assertEqual(db.get(1).lastname, 'Smith')
+        self.assertEqual(list(db.search('lastname', 'smith')), [1])
+        self.assertEqual(db.add_address(Address(firstname='Jane', lastname='Doe')), 2)
+        self.assertIsInstance(db.get(2), AddressRecord)
+
+    def test_journal_mode(self):
+        db = AddressDatabaseCSV(journal=True)
+        db.set_filepath(self.test_file)
+        db.add_addresses([{'firstname': 'John', 'lastname': 'Doe'}, {'firstname': 'Jane', 'lastname': 'Doe'}])
+        db.save()
+        self.assertFalse(os.path.exists(self.test_file + '.journal'))
+        csv_size = os.path.getsize(self.test_file)
+
+        db.add_address(Address(firstname='Max', lastname='Doe', birthdate='2000-01-01'))
+        db.update(1, lastname='Smith', birthdate='1990-02-03')
+        db.delete(2)
+        db.save()
+        db.add_address(Address(firstname='Erika', lastname='Doe'))
+        db.save()
+        db.delete(4)
+        db.save()
+        self.assertEqual(os.path.getsize(self.test_file), csv_size)
+        self.assertTrue(os.path.exists(self.test_file + '.journal'))
+
+        expected = {1: ('John', 'Smith'), 3: ('Max', 'Doe')}
+        reopened = AddressDatabaseCSV(journal=True)
+        reopened.set_filepath(self.test_file)
+        reopened.open()
+        self.assertEqual({id_: (a.firstname, a.lastname) for id_, a in reopened.get_all().items()}, expected)
+        self.assertEqual(reopened.get(3).birthdate, date(2000, 1, 1))
+        self.assertEqual(reopened.get(1).birthdate, date(1990, 2, 3))
+        streamed = {id_: (a.firstname, a.lastname) for id_, a in reopened.iter_addresses()}
+        self.assertEqual(streamed, expected)
+        self.assertEqual(reopened.add_address(Address(firstname='Otto', lastname='Doe')), 5)
+        reopened.delete(5)
+
+        reopened.compact()
+        self.assertFalse(os.path.exists(self.test_file + '.journal'))
+        plain = AddressDatabaseCSV()
+        plain.set_filepath(self.test_file)
+        plain.open()
+        self.assertEqual({id_: (a.firstname, a.lastname) for id_, a in plain.get_all().items()}, expected)
+
+    def test_journal_threshold_compacts(self):
+        db = AddressDatabaseCSV(journal=True, journal_threshold=2)
+        db.set_filepath(self.test_file)
+        db.save()
+        for firstname in ('John', 'Jane', 'Max'):
+            db.add_address(Address(firstname=firstname, lastname='Doe'))
+            db.save()
+        self.assertFalse(os.path.exists(self.test_file + '.journal'))
+        self.assertEqual(len(list(db.iter_addresses())), 3)
+
+    def test_save_skips_clean_book(self):
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe'}, {'firstname': 'Jane', 'lastname': 'Doe'}])
+        self.db.save()
+        db = AddressDatabaseCSV()
+        db.set_filepath(self.test_file)
+        db.open()
+        self.assertFalse(db.dirty)
+        inode = os.stat(self.test_file).st_ino
+        db.save()
+        self.assertEqual(os.stat(self.test_file).st_ino, inode)
+
+        db.update(2, lastname='Smith')
+        self.assertEqual(db.modified_ids, {2})
+        db.close()
+        self.assertNotEqual(os.stat(self.test_file).st_ino, inode)
+        self.assertFalse(db.dirty)
+        self.assertEqual([name for name in os.listdir('.') if name.endswith('.tmp')], [])
+
+    def test_save_new_file_permissions(self):
+        umask = os.umask(0o022)
+        try:
+            self.db.save()
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(self.test_file).st_mode & 0o777, 0o644)
+
+    def test_lazy_mode(self):
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe', 'street': 'Muster\nstraße "A"'},
+                               {'firstname': 'Jane', 'lastname': 'Doe', 'birthdate': '1990-02-03'},
+                               {'firstname': 'Max', 'lastname': 'Smith'}])
+        self.db.delete(2)
+        self.db.save()
+
+        for _ in range(2):  # The second time the cached offset index is used.
+            lazy = AddressDatabaseCSV(lazy=True)
+            lazy.set_filepath(self.test_file)
+            lazy.open()
+            self.assertEqual(lazy.addresses, {})
+            self.assertEqual(lazy.get(1).street, 'Muster\nstraße "A"')
+            self.assertEqual(lazy.get(3).firstname, 'Max')
+            self.assertIsNone(lazy.get(2))
+            self.assertTrue(os.path.exists(self.test_file + '.offsets'))
+            lazy.close()
+
+        self.db.update(3, firstname='Otto')
+        self.db.save()
+        lazy.open()
+        self.assertEqual(lazy.get(3).firstname, 'Otto')
+        self.assertEqual(list(lazy.search('lastname', 'doe')), [1])
+        self.assertEqual(lazy.add_address(Address(firstname='Erika', lastname='Doe')), 4)
+        lazy.close()
+
+    def test_lazy_mode_with_journal(self):
+        db = AddressDatabaseCSV(journal=True)
+        db.set_filepath(self.test_file)
+        db.add_address(Address(firstname='John', lastname='Doe'))
+        db.save()
+        db.update(1, birthdate='1990-02-03')
+        db.add_address(Address(firstname='Jane', lastname='Doe'))
+        db.save()
+
+        lazy = AddressDatabaseCSV(journal=True, lazy=True)
+        lazy.set_filepath(self.test_file)
+        lazy.open()
+        self.assertEqual(lazy.get(1).birthdate, date(1990, 2, 3))
+        self.assertEqual(lazy.get(2).firstname, 'Jane')
+
+    def test_parallel_load(self):
+        self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe', 'street': f'Line\n"{i}"'}
+                               for i in range(200)])
+        self.db.delete(7)
+        self.db.save()
+        with open(self.test_file, 'a', newline='') as file:
+            file.write('500,Max,Doe,,,,,not a date,,\r\n')
+        serial = AddressDatabaseCSV()
+        serial.set_filepath(self.test_file)
+        serial.open()
+
+        parallel = AddressDatabaseCSV(workers=3)
+        parallel.PARALLEL_MIN_BYTES = 0
+        parallel.set_filepath(self.test_file)
+        fieldnames, ranges = parallel._split_file(6)
+        self.assertEqual(len(ranges), 6)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            parallel.open()
+        self.assertIn('Error loading address with ID 500', output.getvalue())
+        self.assertEqual(list(parallel.get_all()), list(range(1, 7)) + list(range(8, 201)))
+        self.assertEqual(parallel.get_all(), serial.get_all())
+        self.assertEqual(parallel.add_address(Address(firstname='Erika', lastname='Doe')), 201)
+
+    def test_snapshot(self):
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe', 'birthdate': '1990-02-03'},
+                               {'firstname': 'Jane', 'lastname': 'Doe'}])
+        self.db.save()
+        first = AddressDatabaseCSV(snapshot=True)
+        first.set_filepath(self.test_file)
+        first.open()
+        self.assertTrue(os.path.exists(self.test_file + '.snapshot'))
+
+        warm = AddressDatabaseCSV(snapshot=True)
+        warm.set_filepath(self.test_file)
+        with mock.patch.object(AddressDatabaseCSV, '_read_file', side_effect=AssertionError):
+            warm.open()
+        self.assertEqual(warm.get_all(), first.get_all())
+        self.assertEqual(warm.get(1).birthdate, date(1990, 2, 3))
+        self.assertEqual(list(warm.search('lastname', 'doe')), [1, 2])
+
+        # Same size and modification time, but different content.
+        stat = os.stat(self.test_file)
+        with open(self.test_file, 'r+') as file:
+            content = file.read().replace('Jane', 'Anna')
+            file.seek(0)
+            file.write(content)
+        os.utime(self.test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        changed = AddressDatabaseCSV(snapshot=True)
+        changed.set_filepath(self.test_file)
+        changed.open()
+        self.assertEqual(changed.get(2).firstname, 'Anna')
+
+        trusted = AddressDatabaseCSV(snapshot=True, trusted=True)
+        trusted.set_filepath(self.test_file)
+        with mock.patch.object(AddressDatabaseCSV, '_read_file', side_effect=AssertionError):
+            trusted.open()
+        self.assertEqual(trusted.get(2).firstname, 'Anna')
+
+    def test_snapshot_fallback(self):
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe', 'birthdate': '1990-02-03'}])
+        self.db.save()
+        first = AddressDatabaseCSV(snapshot=True)
+        first.set_filepath(self.test_file)
+        first.open()
+        with open(self.test_file + '.snapshot', 'r') as file:
+            header = file.readline()
+
+        # A pickled object runs code when it is loaded; the snapshot must be read as plain data only.
+        payload = pickle.dumps(mock.Mock)
+        bad_row = header + '[[1,"John","Doe",null,null,null,null,"not a date",null,null]]'
+        for content in (payload, bad_row.encode(), header.encode() + b'[[1,"John"]]', b'\x80\x05garbage'):
+            with open(self.test_file + '.snapshot', 'wb') as file:
+                file.write(content)
+            reopened = AddressDatabaseCSV(snapshot=True)
+            reopened.set_filepath(self.test_file)
+            output = io.StringIO()
+            with mock.patch('pickle.loads', side_effect=AssertionError), \
+                    mock.patch('pickle.load', side_effect=AssertionError), redirect_stdout(output):
+                reopened.open()
+            self.assertIn('Error reading snapshot', output.getvalue())
+            self.assertEqual(reopened.get_all(), first.get_all())
+            with open(self.test_file + '.snapshot', 'r') as file:
+                self.assertEqual(file.readline(), header)
+
+    def test_transaction(self):
+        self.db.add_address(Address(firstname='John', lastname='Doe'))
+        self.db.save()
+        with self.db.transaction():
+            self.db.add_address(Address(firstname='Jane', lastname='Doe'))
+            self.db.save()
+            self.assertEqual(len(list(self.db.iter_addresses())), 1)
+        self.assertEqual(len(list(self.db.iter_addresses())), 2)
+
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.update(1, lastname='Smith')
+                self.db.delete(2)
+                with self.assertRaises(KeyError):
+                    with self.db.transaction():
+                        self.db.add_address(Address(firstname='Max', lastname='Doe'))
+                        self.db.update(99, lastname='Smith')
+                self.assertIsNone(self.db.get(3))
+                self.db.add_address(Address(firstname='Erika', lastname='Doe'))
+                raise RuntimeError
+        self.assertEqual({id_: a.lastname for id_, a in self.db.get_all().items()}, {1: 'Doe', 2: 'Doe'})
+        self.assertEqual(list(self.db.search('lastname', 'doe')), [1, 2])
+        self.assertFalse(self.db.dirty)
+
+    def test_prefix_search(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Müller'},
+                               {'firstname': 'Max', 'lastname': 'Mülheim'},
+                               {'firstname': 'Erika', 'lastname': 'Mustermann'},
+                               {'firstname': 'Otto', 'lastname': 'müller'},
+                               {'firstname': 'Jane', 'lastname': 'Doe'}])
+        self.assertEqual(list(self.db.prefix_search('lastname', 'mül', 10)), [2, 1, 4])
+        self.assertEqual(len(self.db.prefix_search('lastname', 'Mü', 2)), 2)
+        self.assertEqual(list(self.db.prefix_search('lastname', 'Must')), [3])
+        self.assertEqual(self.db.prefix_search('lastname', 'x'), {})
+        self.db.update(5, lastname='Mülhaupt')
+        self.db.delete(2)
+        self.assertEqual(list(self.db.prefix_search('lastname', 'mülh')), [5])
+        self.assertEqual(list(self.db.prefix_search('firstname', 'o')), [4])
+
+        self.db.add_addresses([{'firstname': 'Emil', 'lastname': 'Zimmer', 'email': 'john_doe@x.de'},
+                               {'firstname': 'Lea', 'lastname': 'zander', 'email': 'john@x.de'},
+                               {'firstname': 'Tom', 'lastname': 'Zz', 'email': 'JOHN@y.de'}])
+        self.assertEqual(list(self.db.prefix_search('lastname', 'Z')), [7, 6, 8])
+        self.assertEqual(list(self.db.prefix_search('email', 'john@')), [7, 8])
+        self.assertEqual(list(self.db.prefix_search('email', 'John_')), [6])
+
+    def test_fuzzy_search(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Müller'},
+                               {'firstname': 'Eva', 'lastname': 'Schmidt'},
+                               {'firstname': 'Otto', 'lastname': 'Schmitt'},
+                               {'firstname': 'Jane', 'lastname': 'Doe'},
+                               {'firstname': 'Max', 'lastname': 'MUELLER'}])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Mueller')), [1, 5])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt')), [3, 2])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt', threshold=0.5)), [3])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt', limit=1)), [3])
+        self.assertEqual(self.db.fuzzy_search('lastname', 'Xyz'), {})
+        self.db.update(4, lastname='Schmid')
+        self.db.delete(3)
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt')), [4, 2])
+        self.assertEqual(list(self.db.fuzzy_search('firstname', 'Ota')), [])
+        self.assertEqual(list(self.db.fuzzy_search('firstname', 'Hanns')), [1])
+        with self.assertRaises(ValueError):
+            self.db.fuzzy_search('phone', '0421')
+
+    def test_search_phonetic(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Meyer'},
+                               {'firstname': 'Eva', 'lastname': 'Schmidt'},
+                               {'firstname': 'Otto', 'lastname': 'Maier'},
+                               {'firstname': 'Robert', 'lastname': 'Schmitt'},
+                               {'firstname': 'Rupert', 'lastname': 'Müller'}])
+        self.assertEqual(list(self.db.search_phonetic('Mayr')), [1, 3])
+        self.assertEqual(list(self.db.search_phonetic('Schmid')), [2, 4])
+        self.assertEqual(list(self.db.search_phonetic('Mueller')), [5])
+        self.assertEqual(list(self.db.search_phonetic('Robert', encoder='soundex')), [4, 5])
+        self.assertEqual(self.db.search_phonetic('Xyz'), {})
+        self.db.update(5, lastname='Meier')
+        self.db.delete(1)
+        self.db.add_addresses([{'firstname': 'Anna', 'lastname': 'Mayer'}])
+        self.assertEqual(list(self.db.search_phonetic('Mayr')), [3, 5, 6])
+        self.assertEqual(self.db.search_phonetic('Müller'), {})
+        with self.assertRaises(ValueError):
+            self.db.search_phonetic('Meyer', encoder='metaphone')
+
+    def test_pagination(self):
+        self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe' if i % 2 else 'Smith'} for i in range(7)])
+        self.db.delete(3)
+        self.assertEqual(list(self.db.get_page(3)), [1, 2, 4])
+        self.assertEqual(list(self.db.get_page(3, after_id=4)), [5, 6, 7])
+        self.assertEqual(self.db.get_page(3, after_id=7), {})
+        self.assertEqual(list(self.db.search_page('lastname', 'doe', 2)), [2, 4])
+        self.assertEqual(list(self.db.search_page('lastname', 'doe', 2, after_id=4)), [6])
+        self.db.update(1, lastname='DOE')
+        self.db.delete(4)
+        self.assertEqual(list(self.db.search_page('lastname', 'doe', 2)), [1, 2])
+        self.assertEqual(list(self.db.search('lastname', 'doe')), [1, 2, 6])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,12 @@
 import os
+import sqlite3
+import threading
 import unittest
+from datetime import date
 from AddressBook.Address import Address
 from AddressBook.AddressDatabaseSQL import AddressDatabaseSQL
+from AddressBook.AddressRecord import AddressRecord
+from AddressBook.SQLiteConnectionPool import SQLiteConnectionPool
 
 
 class TestAddressSQLite(unittest.TestCase):
@@ -13,7 +18,9 @@ class TestAddressSQLite(unittest.TestCase):
 
     def tearDown(self):
         self.db.close()
-        os.remove(self.db.filepath)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db.filepath + suffix):
+                os.remove(self.db.filepath + suffix)
 
     def test_set_filepath_invalid(self):
         with self.assertRaises(ValueError) as context:
@@ -32,6 +39,70 @@ class TestAddressSQLite(unittest.TestCase):
         self.db.add_address(address)
         self.assertTrue(self.db.is_duplicate(address))
 
+    def test_is_duplicate_without_email(self):
+        self.db.add_address(Address(firstname='John', lastname='Doe'))
+        self.assertTrue(self.db.is_duplicate(Address(firstname='John', lastname='Doe')))
+        self.assertFalse(self.db.is_duplicate(Address(firstname='John', lastname='Doe', email='123@gmail.com')))
+        self.db.add_address(Address(firstname='Jane', lastname='Doe', email=''))
+        self.assertTrue(self.db.is_duplicate(Address(firstname='Jane', lastname='Doe')))
+        self.assertEqual(self.db.add_address(Address(firstname='Jane', lastname='Doe')), -1)
+
+    def test_add_addresses(self):
+        self.db.add_address(Address(firstname='Erika', lastname='Muster'))
+        john = Address(firstname='John', lastname='Doe', email='123@gmail.com')
+        result = self.db.add_addresses([john, {'firstname': 'Jane', 'lastname': 'Smith'}, john,
+                                        {'firstname': 'Erika', 'lastname': 'Muster'}, {'lastname': 'Nobody'}])
+        self.assertEqual(result, [2, 3, -1, -1, 0])
+        self.assertEqual(self.db.get(3).lastname, 'Smith')
+        self.assertEqual(len(self.db.get_all()), 3)
+
+    def test_add_addresses_without_autoincrement(self):
+        self.db.close()
+        os.remove('test.db')
+        conn = sqlite3.connect('test.db')
+        conn.execute("CREATE TABLE addressbook (id INTEGER PRIMARY KEY, firstname TEXT NOT NULL, lastname TEXT NOT "
+                     "NULL, street TEXT, number TEXT, postal_code TEXT, place TEXT, birthdate TEXT, phone TEXT, "
+                     "email TEXT);")
+        conn.execute("INSERT INTO addressbook (id, firstname, lastname) VALUES (5, 'Erika', 'Muster');")
+        conn.commit()
+        conn.close()
+        self.db.open()
+        result = self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe'},
+                                        {'firstname': 'Jane', 'lastname': 'Doe'}])
+        self.assertEqual(result, [6, 7])
+        self.assertEqual(self.db.get(7).firstname, 'Jane')
+
+    def test_add_address_conflict_policies(self):
+        john = Address(firstname='John', lastname='Doe', street='Muster', phone='0123')
+        self.assertEqual(self.db.add_address(john), 1)
+        self.assertEqual(self.db.add_address(Address(firstname='John', lastname='Doe', email='')), -1)
+        self.assertEqual(self.db.add_address(Address(firstname='John', lastname='Doe', phone='0421'),
+                                             on_conflict='merge'), 1)
+        self.assertEqual((self.db.get(1).street, self.db.get(1).phone), ('Muster', '0421'))
+        self.assertEqual(self.db.add_addresses([Address(firstname='John', lastname='Doe', place='Bremen')],
+                                               on_conflict='replace'), [1])
+        self.assertEqual((self.db.get(1).street, self.db.get(1).place), (None, 'Bremen'))
+        self.assertEqual(len(self.db.get_all()), 1)
+        with self.assertRaises(ValueError):
+            self.db.add_address(john, on_conflict='overwrite')
+
+    def test_add_address_without_unique_index(self):
+        self.db.close()
+        conn = sqlite3.connect('test.db')
+        conn.execute("DROP INDEX idx_addressbook_unique;")
+        conn.executemany("INSERT INTO addressbook (firstname, lastname) VALUES (?, ?);", [('John', 'Doe')] * 2)
+        conn.commit()
+        conn.close()
+        self.db = AddressDatabaseSQL(on_conflict='merge')
+        self.db.set_filepath('test.db')
+        self.db.open()
+        self.assertFalse(self.db.unique_index)
+        self.assertTrue(self.db.is_duplicate(Address(firstname='John', lastname='Doe', email='')))
+        self.assertEqual(self.db.add_address(Address(firstname='John', lastname='Doe', place='Bremen')), 1)
+        self.assertEqual(self.db.get(1).place, 'Bremen')
+        self.assertEqual(self.db.add_address(Address(firstname='Jane', lastname='Doe'), on_conflict='ignore'), 3)
+        self.assertEqual(self.db.add_address(Address(firstname='Jane', lastname='Doe'), on_conflict='ignore'), -1)
+
     def test_get_all(self):
         address = Address(firstname='John', lastname='Doe', street='Muster', number='12a', postal_code=1,
                           place='bremen', birthdate='2000-01-01', phone='0123456789',email='123@gmail.com')
@@ -70,6 +141,283 @@ class TestAddressSQLite(unittest.TestCase):
         updated_address = self.db.get(new_id)
         self.assertEqual(updated_address.firstname, 'Jane')
 
+    def test_get_todays_birthdays(self):
+        today = date.today()
+        new_id = self.db.add_address(Address(firstname='John', lastname='Doe', birthdate=today.replace(year=1990)))
+        self.db.add_address(Address(firstname='Max', lastname='Doe'))
+        self.assertEqual(list(self.db.get_todays_birthdays()), [new_id])
+
+        self.db.cursor.execute(f"EXPLAIN QUERY PLAN SELECT id FROM {self.db.tablename} WHERE birth_month_day = ?;",
+                               (today.strftime('%m-%d'),))
+        self.assertIn('birth_month_day', ' '.join(row[-1] for row in self.db.cursor.fetchall()))
+
+    def query_plan(self, query, params):
+        self.db.cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return ' '.join(row[-1] for row in self.db.cursor.fetchall())
+
+    def test_indexes_used(self):
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Doe', 'email': 'john@doe.de', 'phone': '0421 123',
+                                'postal_code': 28195}, {'firstname': 'Jane', 'lastname': 'DOE'}])
+        self.assertEqual(list(self.db.search('doe', 'lastname', exact=True)), [1, 2])
+        self.assertEqual(list(self.db.search('JOHN@doe.de', 'email', exact=True)), [1])
+        self.assertEqual(list(self.db.search('28195', 'postal_code', exact=True)), [1])
+        self.assertEqual(list(self.db.search('jo', 'firstname', exact=True)), [])
+
+        for field, index in (('lastname', 'name'), ('firstname', 'firstname'), ('email', 'email'),
+                             ('phone', 'phone'), ('postal_code', 'postal_code')):
+            condition, params = self.db._search_condition('x', field, exact=True)
+            plan = self.query_plan(self.db._select(condition), params)
+            self.assertIn(f'USING INDEX idx_{self.db.tablename}_{index} ', plan)
+        plan = self.query_plan(f"SELECT 1 FROM {self.db.tablename} WHERE firstname = ? AND lastname = ? "
+                               f"AND ifnull(email, '') = ifnull(?, '') LIMIT 1;", ('John', 'Doe', None))
+        self.assertIn(f'USING INDEX idx_{self.db.tablename}_unique (firstname=? AND lastname=? AND <expr>=?)', plan)
+        self.db.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (f'idx_{self.db.tablename}_duplicate',))
+        self.assertIsNone(self.db.cursor.fetchone())
+
+    def test_iter_addresses(self):
+        self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe'} for i in range(5)])
+        self.db.add_address(Address(firstname='Jane', lastname='Smith'))
+        self.assertEqual([id_ for id_, _ in self.db.iter_addresses(batch_size=2)], [1, 2, 3, 4, 5, 6])
+        self.assertEqual([a.firstname for _, a in self.db.iter_search('lastname', 'smi', batch_size=2)], ['Jane'])
+
+    def test_trusted_reads(self):
+        address = Address(firstname='John', lastname='Doe', street='Muster', number='12a', postal_code=1,
+                          place='bremen', birthdate='2000-01-01', phone='0123456789', email='123@gmail.com')
+        self.db.add_addresses([address, Address(firstname='Jane', lastname='Doe')])
+        validated = self.db.get_all()
+        self.db.trusted = True
+        self.assertEqual(self.db.get_all(), validated)
+        self.assertEqual(self.db.get(1), address)
+
+    def test_records_reads(self):
+        address = Address(firstname='John', lastname='Doe', street='Muster', number='12a', postal_code=1,
+                          place='bremen', birthdate='2000-01-01', phone='0123456789', email='123@gmail.com')
+        self.db.add_address(address)
+        for trusted in (False, True):
+            self.db.trusted, self.db.records = trusted, True
+            records = self.db.get_all()
+            self.assertIsInstance(records[1], AddressRecord)
+            self.assertEqual(records[1].to_address(), address)
+            self.assertEqual(self.db.search('Doe', 'lastname'), records)
+
+    def test_search_all_fields(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Müller', 'place': 'Bremen'},
+                               {'firstname': 'Erika', 'lastname': 'Mustermann', 'place': 'Bremerhaven'},
+                               {'firstname': 'Otto', 'lastname': 'Normal', 'place': 'Hamburg'}])
+        self.assertTrue(self.db.fts_available)
+        self.assertEqual(list(self.db.search('brem')), [1, 2])
+        self.assertEqual(list(self.db.search('brem müll')), [1])
+
+        self.db.add_addresses([{'firstname': 'John', 'lastname': 'Smith', 'email': 'bob@example.com'},
+                               {'firstname': 'Bob', 'lastname': 'Jones', 'email': 'john@example.com'}])
+        self.assertEqual(list(self.db.search('john@example.com')), [5])
+
+        self.db.update(3, place='Bremen')
+        self.db.delete(2)
+        self.assertEqual(list(self.db.search('Bremen')), [1, 3])
+        self.assertEqual([id_ for id_, _ in self.db.iter_search('', 'norm')], [3])
+
+        self.db.fts_available = False
+        self.assertEqual(list(self.db.search('reme')), [1, 3])
+
+    def test_search_fts_built_for_existing_rows(self):
+        self.db.add_address(Address(firstname='Hans', lastname='Müller'))
+        self.db.cursor.execute(f"DROP TABLE {self.db.tablename}_fts;")
+        self.db.close()
+        self.db.open()
+        self.assertEqual(list(self.db.search('hans')), [1])
+
+    def test_performance_profile(self):
+        self.db.close()
+        self.db = AddressDatabaseSQL(profile='balanced')
+        self.db.set_filepath('test.db')
+        self.db.open()
+        self.db.cursor.execute("PRAGMA journal_mode;")
+        self.assertEqual(self.db.cursor.fetchone()[0], 'wal')
+        self.db.cursor.execute("PRAGMA synchronous;")
+        self.assertEqual(self.db.cursor.fetchone()[0], 1)
+
+        with self.assertRaises(ValueError):
+            AddressDatabaseSQL(profile='fastest')
+        with self.assertRaises(ValueError):
+            AddressDatabaseSQL(profile={'journal_mode': 'WAL; DROP TABLE addressbook'})
+
+    def test_transaction(self):
+        with self.db.transaction():
+            self.db.add_address(Address(firstname='John', lastname='Doe'))
+            self.db.save()
+            self.assertTrue(self.db.conn.in_transaction)
+        self.assertFalse(self.db.conn.in_transaction)
+
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.update(1, lastname='Smith')
+                with self.assertRaises(RuntimeError):
+                    with self.db.transaction():
+                        self.db.add_addresses([{'firstname': 'Max', 'lastname': 'Doe'}])
+                        raise RuntimeError
+                self.assertEqual(len(self.db.get_all()), 1)
+                self.db.add_address(Address(firstname='Jane', lastname='Doe'))
+                raise RuntimeError
+        self.assertEqual({id_: a.lastname for id_, a in self.db.get_all().items()}, {1: 'Doe'})
+
+    def test_prefix_search(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Müller'},
+                               {'firstname': 'Max', 'lastname': 'Mülheim'},
+                               {'firstname': 'Erika', 'lastname': 'Mustermann'},
+                               {'firstname': 'Otto', 'lastname': 'müller'},
+                               {'firstname': 'Jane', 'lastname': 'Doe'}])
+        self.assertEqual(list(self.db.prefix_search('lastname', 'mül', 10)), [2, 1, 4])
+        self.assertEqual(len(self.db.prefix_search('lastname', 'Mü', 2)), 2)
+        self.assertEqual(list(self.db.prefix_search('lastname', 'Must')), [3])
+        self.assertEqual(self.db.prefix_search('lastname', 'x'), {})
+        self.db.update(5, lastname='Mülhaupt')
+        self.db.delete(2)
+        self.assertEqual(list(self.db.prefix_search('lastname', 'mülh')), [5])
+        self.assertEqual(list(self.db.prefix_search('firstname', 'o')), [4])
+
+        self.db.add_addresses([{'firstname': 'Emil', 'lastname': 'Zimmer', 'email': 'john_doe@x.de'},
+                               {'firstname': 'Lea', 'lastname': 'zander', 'email': 'john@x.de'},
+                               {'firstname': 'Tom', 'lastname': 'Zz', 'email': 'JOHN@y.de'}])
+        self.assertEqual(list(self.db.prefix_search('lastname', 'Z')), [7, 6, 8])
+        self.assertEqual(list(self.db.prefix_search('lastname', 'zi')), [6])
+        self.assertEqual(list(self.db.prefix_search('lastname', 'ZZ')), [8])
+        self.assertEqual(sorted(self.db.prefix_search('email', 'john@')), [7, 8])
+        self.assertEqual(list(self.db.prefix_search('email', 'John_')), [6])
+
+        plan = self.query_plan(self.db._select("lastname >= ? COLLATE NOCASE AND lastname < ? COLLATE NOCASE "
+                                               "AND substr(lastname, 1, ?) = ? COLLATE NOCASE") +
+                               " ORDER BY lastname COLLATE NOCASE LIMIT 10;", ('mül', 'mülm', 3, 'mül'))
+        self.assertIn(f'USING INDEX idx_{self.db.tablename}_name (lastname>? AND lastname<?)', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_fuzzy_search(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Müller'},
+                               {'firstname': 'Eva', 'lastname': 'Schmidt'},
+                               {'firstname': 'Otto', 'lastname': 'Schmitt'},
+                               {'firstname': 'Jane', 'lastname': 'Doe'},
+                               {'firstname': 'Max', 'lastname': 'MUELLER'}])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Mueller')), [1, 5])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt')), [3, 2])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt', threshold=0.5)), [3])
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt', limit=1)), [3])
+        self.assertEqual(self.db.fuzzy_search('lastname', 'Xyz'), {})
+        self.db.update(4, lastname='Schmid')
+        self.db.delete(3)
+        self.assertEqual(list(self.db.fuzzy_search('lastname', 'Schmitt')), [4, 2])
+        self.assertEqual(list(self.db.fuzzy_search('firstname', 'Ota')), [])
+        self.assertEqual(list(self.db.fuzzy_search('firstname', 'Hanns')), [1])
+        with self.assertRaises(ValueError):
+            self.db.fuzzy_search('phone', '0421')
+
+        plan = self.query_plan(f"SELECT id FROM {self.db.tablename}_trigrams WHERE field = ? AND trigram IN (?, ?) "
+                               f"GROUP BY id;", ('lastname', ' sc', 'sch'))
+        self.assertIn(f'SEARCH {self.db.tablename}_trigrams USING PRIMARY KEY (field=? AND trigram=?)', plan)
+
+    def test_search_phonetic(self):
+        self.db.add_addresses([{'firstname': 'Hans', 'lastname': 'Meyer'},
+                               {'firstname': 'Eva', 'lastname': 'Schmidt'},
+                               {'firstname': 'Otto', 'lastname': 'Maier'},
+                               {'firstname': 'Robert', 'lastname': 'Schmitt'},
+                               {'firstname': 'Rupert', 'lastname': 'Müller'}])
+        self.assertEqual(list(self.db.search_phonetic('Mayr')), [1, 3])
+        self.assertEqual(list(self.db.search_phonetic('Schmid')), [2, 4])
+        self.assertEqual(list(self.db.search_phonetic('Mueller')), [5])
+        self.assertEqual(list(self.db.search_phonetic('Robert', encoder='soundex')), [4, 5])
+        self.assertEqual(self.db.search_phonetic('Xyz'), {})
+        self.db.update(5, lastname='Meier')
+        self.db.delete(1)
+        self.assertEqual(list(self.db.search_phonetic('Mayr')), [3, 5])
+        self.assertEqual(self.db.search_phonetic('Müller'), {})
+        with self.assertRaises(ValueError):
+            self.db.search_phonetic('Meyer', encoder='metaphone')
+
+        plan = self.query_plan(f"SELECT id FROM {self.db.tablename}_phonetic WHERE encoder = ? AND code = ?;",
+                               ('cologne', '67'))
+        self.assertIn(f'SEARCH {self.db.tablename}_phonetic USING PRIMARY KEY (encoder=? AND code=?)', plan)
+
+    def test_pagination(self):
+        self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe' if i % 2 else 'Smith'} for i in range(7)])
+        self.db.delete(3)
+        self.assertEqual(list(self.db.get_page(3)), [1, 2, 4])
+        self.assertEqual(list(self.db.get_page(3, after_id=4)), [5, 6, 7])
+        self.assertEqual(self.db.get_page(3, after_id=7), {})
+        self.assertEqual(list(self.db.search_page('lastname', 'doe', 2)), [2, 4])
+        self.assertEqual(list(self.db.search_page('lastname', 'doe', 2, after_id=4)), [6])
+
+    def test_connection_pool(self):
+        self.db.close()
+        self.db = AddressDatabaseSQL(pool_size=3)
+        self.db.set_filepath('test.db')
+        self.db.open()
+        self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe'} for i in range(10)])
+        self.db.cursor.execute("PRAGMA journal_mode;")
+        self.assertEqual(self.db.cursor.fetchone()[0], 'wal')
+
+        results = {}
+        connections = set()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def read(name):
+            barrier.wait()
+            connections.add(id(self.db.conn))
+            addresses = self.db.iter_search('lastname', 'Doe', batch_size=2)
+            first = next(addresses)
+            barrier.wait()
+            results[name] = [first[0]] + [id_ for id_, address in addresses]
+
+        threads = [threading.Thread(target=read, args=(name,)) for name in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {'a': list(range(1, 11)), 'b': list(range(1, 11))})
+        self.assertEqual(len(connections), 2)
+        self.assertEqual(self.db._transaction_depth, 0)
+
+    def test_connection_pool_shared_by_more_threads(self):
+        self.db.close()
+        self.db = AddressDatabaseSQL(pool_size=2)
+        self.db.set_filepath('test.db')
+        self.db.open()
+        self.db.add_addresses([{'firstname': f'John{i}', 'lastname': 'Doe'} for i in range(10)])
+        self.db._pool.timeout = 1
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    self.assertEqual(len(self.db.get_all()), 10)
+                with self.db.transaction():
+                    self.db.update(1, phone='0421')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db._pool._idle.qsize(), len(self.db._pool._connections))
+
+    def test_connection_pool_timeout(self):
+        pool = SQLiteConnectionPool('test.db', 1, timeout=0.1)
+        connection = pool.connection()
+        self.assertIs(pool.connection(), connection)
+        errors = []
+        thread = threading.Thread(target=lambda: errors.append(self.assertRaises(TimeoutError, pool.connection)))
+        thread.start()
+        thread.join()
+        pool.release()
+        thread = threading.Thread(target=lambda: errors.append(pool.connection()))
+        thread.start()
+        thread.join()
+        self.assertIs(errors[-1], connection)
+        pool.close()
+        with self.assertRaises(ValueError):
+            SQLiteConnectionPool('test.db', 0)
+
 
 if __name__ == '__main__':
     unittest.main()